@@ -0,0 +1,92 @@
+"""
+Benchmark the loot event log: record a synthetic raid history clear by
+clear, rebuild the counters from the log, and read the players back.
+
+    python bench_loot_log.py
+    python bench_loot_log.py --characters 16 --weeks 1000
+
+Runs against a throwaway database file, never the bot's own.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+try:
+    import bot_config  # noqa: F401
+except ImportError:
+    # Only the database module is used; it doesn't need a real config
+    sys.modules["bot_config"] = types.ModuleType("bot_config")
+
+from database import LootDatabase
+
+SLOT_TYPES = ("accessory", "body", "feet", "hands", "head", "legs", "weapon")
+JOBS = ("pld", "war", "drk", "gnb", "whm", "sch", "ast", "sge", "mnk", "drg", "nin",
+        "sam", "rpr", "vpr", "brd", "mch", "dnc", "blm", "smn", "rdm", "pct")
+
+# Drops per boss of a four-boss week
+BOSS_DROPS = [
+    ("M1", ["accessory", "accessory"]),
+    ("M2", ["head", "hands", "feet"]),
+    ("M3", ["body", "legs"]),
+    ("M4", ["weapon"]),
+]
+
+def counters(db):
+    return [tuple(row) for row in db.conn.execute("SELECT * FROM character_counters ORDER BY character_id")]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the loot event log.")
+    parser.add_argument("--characters", type=int, default=8)
+    parser.add_argument("--weeks", type=int, default=400, help="Raid weeks of history, e.g. 400 is 50 eight-week tiers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = LootDatabase(os.path.join(tmp, "bench.db"))
+
+        start = time.perf_counter()
+        ids = [db.add_player(i, f"Character {i}", rng.choice(JOBS)) for i in range(args.characters)]
+        db.set_needs({
+            character_id: {slot: rng.randint(1, 2) for slot in rng.sample(SLOT_TYPES, rng.randint(2, 6))}
+            for character_id in ids
+        })
+        print(f"Registered {len(ids)} characters in {time.perf_counter() - start:.2f}s")
+
+        # The static clears every boss once a week
+        clear_times = []
+        for week in range(1, args.weeks + 1):
+            for boss, slots in BOSS_DROPS:
+                drops = [(f"{slot.title()} Coffer", slot) for slot in slots]
+                winners = rng.sample(ids, min(len(drops), len(ids)))
+                awards = [(winner, name, slot) for winner, (name, slot) in zip(winners, drops)]
+                t = time.perf_counter()
+                db.record_clear(week, boss, drops, awards)
+                clear_times.append(time.perf_counter() - t)
+
+        events = db.conn.execute("SELECT COUNT(*) FROM loot_events").fetchone()[0]
+        clear_times.sort()
+        print(f"Recorded {len(clear_times)} clears ({events} events): "
+              f"median {clear_times[len(clear_times) // 2] * 1e3:.3f} ms, "
+              f"p99 {clear_times[int(len(clear_times) * 0.99)] * 1e3:.3f} ms per clear")
+
+        incremental = counters(db)
+        start = time.perf_counter()
+        db.rebuild_counters()
+        print(f"Rebuilt counters from the full log in {(time.perf_counter() - start) * 1e3:.1f} ms")
+        if counters(db) != incremental:
+            print("Rebuilt counters differ from the incremental ones!")
+            sys.exit(1)
+        print("Rebuilt counters match the incremental ones")
+
+        start = time.perf_counter()
+        players = db.load_players()
+        print(f"Loaded {len(players)} players in {(time.perf_counter() - start) * 1e3:.3f} ms")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare gear sheet fetches against the local fake gspread in fakes.py.
+
+    python bench_sheet_fetch.py
+    python bench_sheet_fetch.py --fetches 20
+
+"whole sheet" is the old way: open the spreadsheet by name and download
+every cell on each fetch. "ranges" is GearSheetCog.fetch_sheet_data():
+the spreadsheet is resolved once, then only the parsed cells are read in
+one batched call. Both must parse to the same characters. After the first
+"ranges" fetch nothing on the sheet changes, so no character is parsed again.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import types
+
+try:
+    import bot_config  # noqa: F401
+except ImportError:
+    # The cog only needs these names to import; nothing here talks to Discord or Google
+    sys.modules["bot_config"] = types.SimpleNamespace(
+        SERVER_ID=0, SHEET_NAME="Gear Sheet", GOOGLE_CREDS_PATH="credentials.json"
+    )
+
+from cogs.pull_data import SHEET_LAYOUT, GearSheetCog
+from fakes import FakeGspreadClient, make_gear_sheet
+from sheet_layout import SheetParser
+
+def fetch_whole_sheet(cog, sheet_name):
+    """What fetch_sheet_data() used to do: reopen by name and download everything."""
+    all_values = cog.gspread_client.open(sheet_name).sheet1.get_all_values()
+    parser = SheetParser(SHEET_LAYOUT)  # A fresh one each time, so every character is parsed
+    return parser.parse(parser.ranges_from_grid(all_values))
+
+async def run(fetches):
+    grid = make_gear_sheet()
+    results = {}
+
+    client = FakeGspreadClient(grid)
+    cog = GearSheetCog(None, gspread_client=client)
+    times = []
+    for _ in range(fetches):
+        start = time.perf_counter()
+        before = await asyncio.get_running_loop().run_in_executor(None, fetch_whole_sheet, cog, "Gear Sheet")
+        times.append(time.perf_counter() - start)
+    results["whole sheet"] = (times, client.stats)
+
+    client = FakeGspreadClient(grid)
+    cog = GearSheetCog(None, gspread_client=client)
+    times = []
+    for _ in range(fetches):
+        start = time.perf_counter()
+        after = await cog.fetch_sheet_data("Gear Sheet")
+        times.append(time.perf_counter() - start)
+    results["ranges"] = (times, client.stats)
+    cog.cog_unload()
+
+    if before != [{**char, "changed": True} for char in after]:
+        print("The two fetches parsed different data!")
+        sys.exit(1)
+
+    print(f"{fetches} fetches of a {len(grid)}x{len(grid[0])} sheet, {len(after)} characters parsed the same both ways\n")
+    for name, (times, stats) in results.items():
+        print(f"{name:<12} median {statistics.median(times) * 1e3:7.1f} ms   first {times[0] * 1e3:7.1f} ms   "
+              f"{stats.bytes / fetches / 1024:6.1f} KiB/fetch   calls {stats.calls}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gear sheet fetches against a fake gspread.")
+    parser.add_argument("--fetches", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.fetches))
+
+if __name__ == "__main__":
+    main()
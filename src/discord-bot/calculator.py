@@ -0,0 +1,62 @@
+# calculator.py
+"""
+Access to the loot calculator from the bot process.
+
+The calculator's modules import each other by bare name (main, constants,
+...), and some of those names are the bot's own modules too, so the bot
+process never puts the calculator on its path. The numpy-free modules it
+needs (item, player) are loaded here under "loot_calculator_" names
+instead; the solver's worker processes, which import the rest, get the
+path from init_worker().
+"""
+import bot_config
+import importlib.util
+import os
+import sys
+
+# The loot calculator lives next to the bot in this repo
+LOOT_CALCULATOR_PATH = getattr(
+    bot_config, "LOOT_CALCULATOR_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "loot-calculator"),
+)
+
+def load_module(name, requires=()):
+    """
+    Load one of the calculator's modules as "loot_calculator_<name>".
+
+    requires lists the calculator modules it imports by bare name; they are
+    loaded first and only visible under those names while it runs.
+    """
+    qualified = f"loot_calculator_{name}"
+    if qualified in sys.modules:
+        return sys.modules[qualified]
+
+    dependencies = {dependency: load_module(dependency) for dependency in requires}
+    spec = importlib.util.spec_from_file_location(qualified, os.path.join(LOOT_CALCULATOR_PATH, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    shadowed = {dependency: sys.modules.get(dependency) for dependency in dependencies}
+    sys.modules.update(dependencies)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        for dependency, previous in shadowed.items():
+            if previous is None:
+                del sys.modules[dependency]
+            else:
+                sys.modules[dependency] = previous
+    sys.modules[qualified] = module
+    return module
+
+def init_worker():
+    """
+    Run once in each solver worker process: put the calculator first on the path.
+
+    Only the workers import the calculator by its bare module names, so only
+    their path changes; first, or "main" would find the bot's own main.py.
+    """
+    if LOOT_CALCULATOR_PATH in sys.path:
+        sys.path.remove(LOOT_CALCULATOR_PATH)
+    sys.path.insert(0, LOOT_CALCULATOR_PATH)
+
+item = load_module("item")
+player = load_module("player", requires=["item"])
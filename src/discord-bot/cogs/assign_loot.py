@@ -0,0 +1,173 @@
+# cogs/assign_loot.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+import bot_config
+from bot_config import SERVER_ID, SHEET_NAME
+import calculator
+from database import get_database
+from sheet_layout import GEAR_SLOT_TYPES
+from cogs.pull_data import SHEET_LAYOUT
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Processes solving assignments, so a large solve never blocks the event loop (and the gateway heartbeat)
+SOLVER_WORKERS = getattr(bot_config, "SOLVER_WORKERS", None) or os.cpu_count() or 1
+
+def gear_needs(character, slot_types=GEAR_SLOT_TYPES):
+    """
+    What a character still needs, from their current gear against their BiS.
+
+    A slot is needed when its BiS is filled in and the current item isn't
+    the same (ignoring case and spaces).
+
+    Returns:
+        dict: {slot_type: count}, e.g. two rings still to get is {"accessory": 2}.
+    """
+    needs = {}
+    for slot, bis in character["bis"].items():
+        slot_type = slot_types.get(slot)
+        if slot_type is None or bis == "Empty":
+            continue
+        if character["current"].get(slot, "Empty").strip().casefold() != bis.strip().casefold():
+            needs[slot_type] = needs.get(slot_type, 0) + 1
+    return needs
+
+def parse_drops(text):
+    """The items of a comma-separated list of slot types, e.g. "head, accessory, accessory"."""
+    items = []
+    for part in text.split(","):
+        if part.strip():
+            slot_type = calculator.item.parse_slot_type(part)
+            items.append((f"{slot_type.title()} Coffer", slot_type))
+    if not items:
+        raise ValueError("No drops given")
+    return items
+
+def _solve_static(static, players, items):
+    """Run in a worker process (see calculator.init_worker): build the roster and solve one static."""
+    from item import Item
+    from main import assign_loot
+    from player import Player
+
+    roster = [
+        Player(p["name"], p["job"], p["is_main_spec"], p["bosses_without_loot"], p["items_needed"], p["slot_types_needed"])
+        for p in players
+    ]
+    return static, assign_loot(roster, [Item(name, slot_type) for name, slot_type in items])
+
+class AssignLoot(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self._pool = None
+
+    def cog_unload(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _solver_pool(self):
+        """The worker processes, started on first use."""
+        if self._pool is None:
+            # Spawned rather than forked: forking copies the running event loop's threads and sockets
+            self._pool = ProcessPoolExecutor(
+                max_workers=SOLVER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=calculator.init_worker,
+            )
+        return self._pool
+
+    async def build_rosters(self, characters):
+        """
+        Group the sheet's characters into one roster per static (sheet tab).
+
+        Needs come from the sheet and are saved to the database; job, spec and
+        bosses without loot come from the database. Characters nobody has
+        registered are left out.
+
+        Returns:
+            tuple[dict, list[str]]: {static: [player dicts]} and the names of unregistered characters.
+        """
+        db = get_database()
+        registered = {}
+        for character in await db.get_characters():
+            registered.setdefault(character["name"].strip().casefold(), character["id"])
+
+        statics = {}
+        needs = {}
+        unregistered = []
+        for character in characters:
+            character_id = registered.get(character["name"].strip().casefold())
+            if character_id is None:
+                unregistered.append(character["name"])
+                continue
+            needs[character_id] = gear_needs(character, SHEET_LAYOUT.get("slot_types", GEAR_SLOT_TYPES))
+            statics.setdefault(character["tab"], []).append(character_id)
+
+        await db.set_needs(needs)
+        players = {player["id"]: player for player in await db.load_players(list(needs))}
+        rosters = {
+            static: [players[character_id] for character_id in character_ids if players[character_id]["job"]]
+            for static, character_ids in statics.items()
+        }
+        return rosters, unregistered
+
+    @app_commands.command(
+            name="assignloot",
+            description="Work out who should get this week's drops, from the gear sheet")
+    @app_commands.guilds(discord.Object(id=SERVER_ID))
+    @app_commands.describe(drops="Slot types that dropped, comma-separated, e.g. head, hands, accessory")
+    async def assign_loot(self, interaction: discord.Interaction, drops: str):
+        try:
+            items = parse_drops(drops)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+
+        try:
+            gear_sheet = self.bot.get_cog("GearSheetCog")
+            characters, _ = await gear_sheet.get_sheet_data(SHEET_NAME)
+            rosters, unregistered = await self.build_rosters(characters)
+            if not rosters:
+                await interaction.followup.send("Nobody on the gear sheet has registered yet. Use /register first.")
+                return
+
+            # One solve per static, each posted as soon as it finishes
+            loop = asyncio.get_running_loop()
+            pool = self._solver_pool()
+            solves = [
+                loop.run_in_executor(pool, _solve_static, static, players, items)
+                for static, players in rosters.items()
+            ]
+            for solve in asyncio.as_completed(solves):
+                static, assignments = await solve
+                embed = discord.Embed(
+                    title=f"🎁 Loot for {static}" if static else "🎁 Loot",
+                    color=discord.Color.gold()
+                )
+                for player_name, item_name in assignments:
+                    embed.add_field(name=item_name, value=player_name, inline=True)
+                unassigned = len(items) - len(assignments)
+                if unassigned:
+                    embed.set_footer(text=f"{unassigned} item(s) nobody needs")
+                await interaction.followup.send(embed=embed)
+
+            if unregistered:
+                await interaction.followup.send(
+                    f"Not registered, so left out: {', '.join(unregistered)}", ephemeral=True
+                )
+
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._pool = None  # A worker died; start fresh ones next time
+            await interaction.followup.send(f"❌ Error assigning loot: {e}", ephemeral=True)
+            print(f"Full error: {e}")
+            import traceback
+            traceback.print_exc()
+
+async def setup(bot):
+    await bot.add_cog(AssignLoot(bot))
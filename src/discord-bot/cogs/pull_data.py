@@ -2,148 +2,185 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import bot_config
 from bot_config import SERVER_ID, SHEET_NAME, GOOGLE_CREDS_PATH
-import gspread
-from google.oauth2.service_account import Credentials
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sheet_layout import DEFAULT_LAYOUT, SheetParser
 
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
     'https://www.googleapis.com/auth/drive'
 ]
 
-CURRENT_COLUMNS = ["D", "I", "N", "S"]
-BIS_COLUMNS = ["B", "G", "L", "Q"]
+# Where the characters are on the sheet; see sheet_layout.py for the format
+SHEET_LAYOUT = getattr(bot_config, "SHEET_LAYOUT", DEFAULT_LAYOUT)
 
-# Define the cell ranges for each character (top row)
-CHARACTER_CONFIGS_TOP = [
-    {"name_cell": "B4", "current_col": CURRENT_COLUMNS[0], "bis_col": BIS_COLUMNS[0]},  # Character 1
-    {"name_cell": "G4", "current_col": CURRENT_COLUMNS[1], "bis_col": BIS_COLUMNS[1]},  # Character 2
-    {"name_cell": "L4", "current_col": CURRENT_COLUMNS[2], "bis_col": BIS_COLUMNS[2]},  # Character 3
-    {"name_cell": "Q4", "current_col": CURRENT_COLUMNS[3], "bis_col": BIS_COLUMNS[3]},  # Character 4
-]
+# Parsed sheet data younger than this (seconds) is served without asking Google
+SHEET_CACHE_TTL = getattr(bot_config, "SHEET_CACHE_TTL", 60)
 
-# Define the cell ranges for each character (bottom row)
-CHARACTER_CONFIGS_BOTTOM = [
-    {"name_cell": "B31", "current_col": CURRENT_COLUMNS[0], "bis_col": BIS_COLUMNS[0]},  # Character 5
-    {"name_cell": "G31", "current_col": CURRENT_COLUMNS[1], "bis_col": BIS_COLUMNS[1]},  # Character 6
-    {"name_cell": "L31", "current_col": CURRENT_COLUMNS[2], "bis_col": BIS_COLUMNS[2]},  # Character 7
-    {"name_cell": "Q31", "current_col": CURRENT_COLUMNS[3], "bis_col": BIS_COLUMNS[3]},  # Character 8
-]
+# Up to this age it's still served straight away, but refreshed in the background
+SHEET_STALE_TTL = getattr(bot_config, "SHEET_STALE_TTL", 15 * 60)
 
-# Gear slot rows for top characters
-GEAR_ROWS = range(7, 20)            # Rows 7-19
+# Open the spreadsheet by key if one is configured; otherwise it's looked up by name once
+SHEET_KEY = getattr(bot_config, "SHEET_KEY", None)
 
-# For bottom characters
-GEAR_ROWS_BOTTOM = range(34, 47)    # Rows 34-46
-
-GEAR_SLOT_NAMES = [
-    "Weapon", "Off-hand", "Head", "Chest", "Gloves", "Pants", "Boots",
-    "Earring", "Necklace", "Bracelet", "Ring1", "Ring2"
-]
+# Threads (and kept-alive HTTP connections) used for Google Sheets calls
+SHEET_FETCH_WORKERS = 2
 
 class GearSheetCog(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, gspread_client=None):
         self.bot = bot
-        creds = Credentials.from_service_account_file(GOOGLE_CREDS_PATH, scopes=SCOPES)
-        self.gspread_client = gspread.authorize(creds)
-    
+        self.gspread_client = gspread_client  # Authorized on first fetch if not given
+        self._executor = ThreadPoolExecutor(max_workers=SHEET_FETCH_WORKERS, thread_name_prefix="gear-sheet")
+        self._spreadsheets = {}     # sheet name -> (spreadsheet, title of its first tab), opened once
+        self._parsers = {}          # sheet name -> its compiled layout, remembering the last parse
+        self._sheet_cache = {}      # sheet name -> (fetched at, parsed characters)
+        self._sheet_fetches = {}    # sheet name -> the fetch currently running for it
+        self._awaited_fetches = set()  # running fetches some command is waiting on
+
+    async def get_sheet_data(self, sheet_name: str, force_refresh: bool = False):
+        """
+        Parsed sheet data, from the cache when it's fresh enough.
+
+        - Younger than SHEET_CACHE_TTL: returned as is.
+        - Younger than SHEET_STALE_TTL: returned as is, and refreshed in the background.
+        - Older, missing, or force_refresh: fetched now.
+
+        However many commands ask at once, only one fetch per sheet runs at a time;
+        everyone waiting gets its result. Data served from the cache comes back
+        with every "changed" False, as nothing was fetched for it.
+
+        Returns:
+            tuple[list[dict], float]: The characters and how old they are, in seconds.
+        """
+        cached = self._sheet_cache.get(sheet_name)
+        if cached and not force_refresh:
+            fetched_at, data = cached
+            age = time.monotonic() - fetched_at
+            if age < SHEET_CACHE_TTL:
+                return self._unchanged(data), age
+            if age < SHEET_STALE_TTL:
+                self._start_fetch(sheet_name)
+                return self._unchanged(data), age
+
+        # Shielded so a cancelled command doesn't cancel the fetch others are waiting on
+        task = self._start_fetch(sheet_name)
+        self._awaited_fetches.add(task)
+        data = await asyncio.shield(task)
+        return data, time.monotonic() - self._sheet_cache[sheet_name][0]
+
+    @staticmethod
+    def _unchanged(data):
+        """The cached characters, without the changes of the fetch that cached them."""
+        return [{**char, "changed": False} for char in data]
+
+    def _start_fetch(self, sheet_name: str):
+        """The running fetch for this sheet, or a new one if none is running."""
+        task = self._sheet_fetches.get(sheet_name)
+        if task is None:
+            task = asyncio.create_task(self._fetch_into_cache(sheet_name))
+            self._sheet_fetches[sheet_name] = task
+            task.add_done_callback(lambda t: self._fetch_done(sheet_name, t))
+        return task
+
+    async def _fetch_into_cache(self, sheet_name: str):
+        data = await self.fetch_sheet_data(sheet_name)
+        self._sheet_cache[sheet_name] = (time.monotonic(), data)
+        return data
+
+    def _fetch_done(self, sheet_name: str, task):
+        self._sheet_fetches.pop(sheet_name, None)
+        awaited = task in self._awaited_fetches
+        self._awaited_fetches.discard(task)
+        # Background refreshes have nobody awaiting them, so report their errors here;
+        # a foreground fetch's error is raised to the commands waiting on it instead
+        if not task.cancelled() and task.exception() is not None and not awaited:
+            print(f"Refreshing sheet {sheet_name!r} failed: {task.exception()}")
+
+    def cog_unload(self):
+        self._executor.shutdown(wait=False)
+
+    def _client(self):
+        """
+        The gspread client, authorized on first use.
+
+        gspread and google-auth are imported here rather than at the top, so
+        loading the cog (and starting the bot) doesn't wait on them.
+        """
+        if self.gspread_client is None:
+            import gspread
+            from google.oauth2.service_account import Credentials
+            from google.auth.transport.requests import AuthorizedSession
+            from requests.adapters import HTTPAdapter
+
+            creds = Credentials.from_service_account_file(GOOGLE_CREDS_PATH, scopes=SCOPES)
+            # One session with a connection per worker thread, so requests reuse kept-alive connections
+            session = AuthorizedSession(creds)
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=SHEET_FETCH_WORKERS))
+            self.gspread_client = gspread.authorize(creds, session=session)
+        return self.gspread_client
+
+    def _spreadsheet(self, sheet_name: str):
+        """The spreadsheet and its first tab's title, resolved on first use and reused after that."""
+        opened = self._spreadsheets.get(sheet_name)
+        if opened is None:
+            if SHEET_KEY and sheet_name == SHEET_NAME:
+                spreadsheet = self._client().open_by_key(SHEET_KEY)
+            else:
+                spreadsheet = self._client().open(sheet_name)  # Drive search by name
+            opened = self._spreadsheets[sheet_name] = (spreadsheet, spreadsheet.sheet1.title)
+        return opened
+
     async def fetch_sheet_data(self, sheet_name: str):
-        """Fetch and parse the gear sheet"""
-        loop = asyncio.get_event_loop()
-        
+        """
+        Fetch and parse the gear sheet.
+
+        Only the cells in SHEET_LAYOUT are read, from every tab it lists, in
+        one batched API call. Characters whose cells are the same as on the
+        previous fetch aren't parsed again and come back with "changed" False.
+        """
+        loop = asyncio.get_running_loop()
+        parser = self._parsers.get(sheet_name)
+        if parser is None:
+            parser = self._parsers[sheet_name] = SheetParser(SHEET_LAYOUT)
+
         def _fetch():
-            sheet = self.gspread_client.open(sheet_name).sheet1
-            
-            # GET THE ENTIRE SHEET IN ONE API CALL
-            all_values = sheet.get_all_values()
-            
-            all_characters = []
-            
-            # Parse top row of characters (1-4)
-            for config in CHARACTER_CONFIGS_TOP:
-                char_data = self._parse_character(all_values, config, GEAR_ROWS)
-                if char_data["name"]:
-                    all_characters.append(char_data)
-            
-            # Parse bottom row of characters (5-8)
-            for config in CHARACTER_CONFIGS_BOTTOM:
-                char_data = self._parse_character(all_values, config, GEAR_ROWS_BOTTOM)
-                if char_data["name"]:
-                    all_characters.append(char_data)
-            
-            return all_characters
-        
-        data = await loop.run_in_executor(None, _fetch)
+            spreadsheet, first_tab = self._spreadsheet(sheet_name)
+            response = spreadsheet.values_batch_get(parser.ranges(first_tab))
+            return parser.parse([value_range.get("values", []) for value_range in response["valueRanges"]])
+
+        data = await loop.run_in_executor(self._executor, _fetch)
         return data
 
-    def _parse_character(self, all_values, config, rows):
-        """Parse a single character's gear data from the 2D array"""
-        # Convert cell notation (like "B2") to row/col indices
-        def cell_to_index(cell):
-            """Convert 'B2' to (row_idx, col_idx) - zero-indexed"""
-            col = ord(cell[0]) - ord('A')   # B -> 1
-            row = int(cell[1:]) - 1         # 2 -> 1 (zero-indexed)
-            return row, col
-        
-        # Get character name
-        name_row, name_col = cell_to_index(config["name_cell"])
-        char_name = all_values[name_row][name_col] if name_row < len(all_values) and name_col < len(all_values[name_row]) else "Unknown"
-        
-        # Get character ilvl
-        ilvl_row, ilvl_col = name_row + 1, name_col # TODO: Put this in the config rather than calculating based on name position
-        ilvl = all_values[ilvl_row][ilvl_col] if ilvl_row < len(all_values) and ilvl_col < len(all_values[ilvl_row]) else "Unknown"
-        
-        # Get column index for current and BiS gear
-        current_col = ord(config["current_col"]) - ord('A')
-        bis_col = ord(config["bis_col"]) - ord('A')
-        
-        # Get current gear
-        current_gear = {}
-        for i, row in enumerate(rows):
-            if i < len(GEAR_SLOT_NAMES):
-                row_idx = row - 1  # Convert to zero-indexed
-                cell_value = all_values[row_idx][current_col] if row_idx < len(all_values) and current_col < len(all_values[row_idx]) else "Empty"
-                current_gear[GEAR_SLOT_NAMES[i]] = cell_value or "Empty"
-        
-        # Get BiS gear
-        bis_gear = {}
-        for i, row in enumerate(rows):
-            if i < len(GEAR_SLOT_NAMES):
-                row_idx = row - 1  # Convert to zero-indexed
-                cell_value = all_values[row_idx][bis_col] if row_idx < len(all_values) and bis_col < len(all_values[row_idx]) else "Empty"
-                bis_gear[GEAR_SLOT_NAMES[i]] = cell_value or "Empty"
-        
-        return {
-            "name": char_name,
-            "ilvl": ilvl,
-            "current": current_gear,
-            "bis": bis_gear
-        }
-    
     @app_commands.command(
             name="pullgear", 
             description="Pull gear data from Google Sheets")
     @app_commands.guilds(discord.Object(id=SERVER_ID))
-    async def pull_gear(self, interaction: discord.Interaction):
+    @app_commands.describe(refresh="Fetch the sheet again instead of using recently pulled data")
+    async def pull_gear(self, interaction: discord.Interaction, refresh: bool = False):
         await interaction.response.defer()
         
         try:
-            data = await self.fetch_sheet_data(SHEET_NAME)
+            data, age = await self.get_sheet_data(SHEET_NAME, force_refresh=refresh)
             
             # Create embed to display the data
             embed = discord.Embed(
                 title="📊 Gear Data Retrieved",
-                description=f"Successfully pulled data for {len(data)} characters",
+                description=f"Successfully pulled data for {len(data)} characters "
+                            f"({sum(char['changed'] for char in data)} changed since the last pull)",
                 color=discord.Color.green()
             )
+            embed.set_footer(text=f"Sheet data from {age:.0f}s ago")
             
             for char in data:
                 # Show current gear summary
                 current_summary = ", ".join([f"{slot}: {gear}" for slot, gear in list(char["current"].items())[:3]])
                 bis_summary = ", ".join([f"{slot}: {gear}" for slot, gear in list(char["bis"].items())[:3]])
+                tab = f" ({char['tab']})" if char["tab"] else ""
                 embed.add_field(
-                    name=f"✅ {char['name']}",
+                    name=f"✅ {char['name']}{tab}",
                     value=f"**Current**: {current_summary}\n**BiS**: {bis_summary}\n**iLvL**: {char["ilvl"]}",
                     inline=False
                 )
@@ -3,7 +3,10 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from bot_config import SERVER_ID
-#from database import add_player
+from calculator import player
+from database import get_database
+
+JOB_CHOICES = [app_commands.Choice(name=job.full, value=job.short) for job in player.JOBS]
 
 class Register(commands.Cog):
     def __init__(self, bot):
@@ -14,9 +17,13 @@ class Register(commands.Cog):
         description="Register your character for the loot tracker."
     )
     @app_commands.guilds(discord.Object(id=SERVER_ID))
-    async def register(self, interaction: discord.Interaction, character_name: str):
-        # add_player(interaction.user.id, character_name) TODO: Implement this in the database
-        await interaction.response.send_message(f"Registered as {character_name}!", ephemeral=True)
+    @app_commands.describe(character_name="Your character's name", job="The job you're gearing, needed for /assignloot")
+    @app_commands.choices(job=JOB_CHOICES)
+    async def register(self, interaction: discord.Interaction, character_name: str, job: app_commands.Choice[str] = None):
+        # Without a job, a character that's already registered keeps the one it has
+        await get_database().add_player(interaction.user.id, character_name, job.value if job else None)
+        job_text = f" ({job.name})" if job else ""
+        await interaction.response.send_message(f"Registered as {character_name}{job_text}!", ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(Register(bot))
\ No newline at end of file
@@ -0,0 +1,423 @@
+# database.py
+import asyncio
+import functools
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import bot_config
+
+DEFAULT_DB_PATH = getattr(
+    bot_config, "DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "loot.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id          INTEGER PRIMARY KEY,
+    discord_id  INTEGER NOT NULL UNIQUE,
+    created_at  TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS characters (
+    id            INTEGER PRIMARY KEY,
+    player_id     INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    name          TEXT NOT NULL,
+    job           TEXT,
+    is_main_spec  INTEGER NOT NULL DEFAULT 1,
+    UNIQUE (player_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS drops (
+    id          INTEGER PRIMARY KEY,
+    week        INTEGER NOT NULL,
+    boss        TEXT NOT NULL,
+    item_name   TEXT NOT NULL,
+    slot_type   TEXT NOT NULL,
+    dropped_at  TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Append-only log of everything that moves a character's loot counters.
+-- "clear" is a boss kill, "award" an item handed out at that kill, and
+-- "register" a character joining. clear is how many bosses had been
+-- cleared at the time, counting this one.
+CREATE TABLE IF NOT EXISTS loot_events (
+    id            INTEGER PRIMARY KEY,
+    kind          TEXT NOT NULL CHECK (kind IN ('register', 'clear', 'award')),
+    clear         INTEGER NOT NULL,
+    week          INTEGER,
+    boss          TEXT,
+    character_id  INTEGER REFERENCES characters(id) ON DELETE CASCADE,
+    item_name     TEXT,
+    slot_type     TEXT,
+    created_at    TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Counters derived from loot_events, kept up to date on every write and
+-- rebuildable from the log with rebuild_counters(). bosses_without_loot
+-- is the number of clears since last_award_clear, so a clear doesn't
+-- have to touch every character.
+CREATE TABLE IF NOT EXISTS character_counters (
+    character_id      INTEGER PRIMARY KEY REFERENCES characters(id) ON DELETE CASCADE,
+    last_award_clear  INTEGER NOT NULL DEFAULT 0,
+    last_award_week   INTEGER,
+    awards            INTEGER NOT NULL DEFAULT 0,
+    items_needed      INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS loot_state (
+    name   TEXT PRIMARY KEY,
+    value  INTEGER NOT NULL
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO loot_state (name, value) VALUES ('clears', 0);
+
+CREATE TABLE IF NOT EXISTS needs (
+    character_id  INTEGER NOT NULL REFERENCES characters(id) ON DELETE CASCADE,
+    slot_type     TEXT NOT NULL,
+    count         INTEGER NOT NULL,
+    PRIMARY KEY (character_id, slot_type)
+) WITHOUT ROWID;
+
+-- A character's history, and rebuilding counters from the log
+CREATE INDEX IF NOT EXISTS loot_events_by_character ON loot_events (character_id, kind, clear, week);
+
+-- "Open needs per slot" only ever looks at needs that aren't filled yet
+CREATE INDEX IF NOT EXISTS open_needs_by_slot ON needs (slot_type, character_id) WHERE count > 0;
+
+CREATE INDEX IF NOT EXISTS drops_by_week ON drops (week);
+"""
+
+class LootDatabase:
+    """
+    SQLite store for players, their characters, drops, awards and open needs.
+
+    Boss clears and awards go into an append-only loot_events log. The
+    per-character counters assign_loot() needs are updated in the same
+    transaction, so reading them never scans the history.
+
+    Blocking: every method runs its queries right away. Bot code should go
+    through AsyncLootDatabase instead, which runs them off the event loop.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets readers keep going while a write is in progress
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ----- Players and characters -----
+
+    def add_player(self, discord_id, character_name, job=None, is_main_spec=True):
+        """Register a character for a Discord user, updating its job if it already exists. Returns the character id."""
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO players (discord_id) VALUES (?)", (discord_id,))
+            character_id = self.conn.execute(
+                """
+                INSERT INTO characters (player_id, name, job, is_main_spec)
+                VALUES ((SELECT id FROM players WHERE discord_id = ?), ?, ?, ?)
+                ON CONFLICT (player_id, name) DO UPDATE SET
+                    job = COALESCE(excluded.job, characters.job),
+                    is_main_spec = excluded.is_main_spec
+                RETURNING id
+                """,
+                (discord_id, character_name, job, int(is_main_spec)),
+            ).fetchone()["id"]
+
+            # New characters start counting bosses without loot from now
+            added = self.conn.execute(
+                """
+                INSERT OR IGNORE INTO character_counters (character_id, last_award_clear)
+                SELECT ?, value FROM loot_state WHERE name = 'clears'
+                """,
+                (character_id,),
+            ).rowcount
+            if added:
+                self.conn.execute(
+                    """
+                    INSERT INTO loot_events (kind, clear, character_id)
+                    SELECT 'register', value, ? FROM loot_state WHERE name = 'clears'
+                    """,
+                    (character_id,),
+                )
+            return character_id
+
+    def get_characters(self, discord_id=None):
+        """Every character, or only those of one Discord user."""
+        query = """
+            SELECT c.id, c.name, c.job, c.is_main_spec, p.discord_id
+            FROM characters c JOIN players p ON p.id = c.player_id
+        """
+        if discord_id is None:
+            rows = self.conn.execute(query)
+        else:
+            rows = self.conn.execute(query + " WHERE p.discord_id = ?", (discord_id,))
+        return [dict(row) for row in rows]
+
+    # ----- Loot -----
+
+    def clears(self):
+        """How many bosses have been cleared so far."""
+        return self.conn.execute("SELECT value FROM loot_state WHERE name = 'clears'").fetchone()["value"]
+
+    def record_clear(self, week, boss, drops=(), awards=()):
+        """
+        Log one boss clear with what dropped and who got it, in one transaction.
+
+        Appends the clear and its awards to loot_events and updates the
+        counters of the awarded characters to match: their bosses without
+        loot go back to 0 and one open need of that slot is filled. Everybody
+        else's bosses without loot goes up by one without being written.
+
+        No command calls this yet (only bench_loot_log.py does), so until
+        one logs clears, every character's bosses without loot stays 0.
+
+        Args:
+            week (int): Raid week of the clear.
+            boss (str): Which boss was cleared.
+            drops (iterable[tuple[str, str]]): (item_name, slot_type) for each drop.
+            awards (iterable[tuple[int, str, str]]): (character_id, item_name, slot_type)
+                for each item handed out.
+        """
+        awards = list(awards)
+        with self.conn:
+            clear = self.conn.execute(
+                "UPDATE loot_state SET value = value + 1 WHERE name = 'clears' RETURNING value"
+            ).fetchone()["value"]
+            self.conn.execute(
+                "INSERT INTO loot_events (kind, clear, week, boss) VALUES ('clear', ?, ?, ?)", (clear, week, boss)
+            )
+            self.conn.executemany(
+                "INSERT INTO drops (week, boss, item_name, slot_type) VALUES (?, ?, ?, ?)",
+                [(week, boss, item_name, slot_type) for item_name, slot_type in drops],
+            )
+            self.conn.executemany(
+                """
+                INSERT INTO loot_events (kind, clear, week, boss, character_id, item_name, slot_type)
+                VALUES ('award', ?, ?, ?, ?, ?, ?)
+                """,
+                [(clear, week, boss, character_id, item_name, slot_type)
+                 for character_id, item_name, slot_type in awards],
+            )
+            self.conn.executemany(
+                "UPDATE needs SET count = count - 1 WHERE character_id = ? AND slot_type = ? AND count > 0",
+                [(character_id, slot_type) for character_id, _, slot_type in awards],
+            )
+            self.conn.executemany(
+                """
+                UPDATE character_counters SET
+                    last_award_clear = ?,
+                    last_award_week = ?,
+                    awards = awards + 1,
+                    items_needed = (SELECT COALESCE(SUM(count), 0) FROM needs
+                                    WHERE needs.character_id = character_counters.character_id AND count > 0)
+                WHERE character_id = ?
+                """,
+                [(clear, week, character_id) for character_id, _, _ in awards],
+            )
+
+    def set_needs(self, needs):
+        """
+        Replace the open needs of one or more characters in one transaction.
+
+        needs maps character_id to {slot_type: count}. Each character's
+        items_needed counter becomes the total of its counts.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE character_counters SET items_needed = ? WHERE character_id = ?",
+                [(sum(max(count, 0) for count in slots.values()), character_id)
+                 for character_id, slots in needs.items()],
+            )
+            self.conn.executemany(
+                "DELETE FROM needs WHERE character_id = ?", [(character_id,) for character_id in needs]
+            )
+            self.conn.executemany(
+                "INSERT INTO needs (character_id, slot_type, count) VALUES (?, ?, ?)",
+                [
+                    (character_id, slot_type, count)
+                    for character_id, slots in needs.items()
+                    for slot_type, count in slots.items()
+                    if count > 0
+                ],
+            )
+
+    # ----- Hot queries -----
+
+    def weeks_since_last_award(self, current_week):
+        """
+        How many weeks each character has gone without an award.
+
+        Returns:
+            list[dict]: character_id, name and weeks (None if never awarded).
+        """
+        rows = self.conn.execute(
+            """
+            SELECT c.id AS character_id, c.name, ? - k.last_award_week AS weeks
+            FROM characters c JOIN character_counters k ON k.character_id = c.id
+            """,
+            (current_week,),
+        )
+        return [dict(row) for row in rows]
+
+    def load_players(self, character_ids=None):
+        """
+        Everything assign_loot() needs about each character, in one read.
+
+        Returns:
+            list[dict]: name, job, is_main_spec, bosses_without_loot,
+            items_needed and slot_types_needed (a list of slot types with an
+            open need), i.e. the arguments of the calculator's Player.
+        """
+        query = """
+            SELECT c.id, c.name, c.job, c.is_main_spec,
+                   (SELECT value FROM loot_state WHERE name = 'clears') - k.last_award_clear AS bosses_without_loot,
+                   k.items_needed,
+                   (SELECT group_concat(n.slot_type) FROM needs n
+                    WHERE n.character_id = c.id AND n.count > 0) AS slot_types_needed
+            FROM characters c JOIN character_counters k ON k.character_id = c.id
+        """
+        if character_ids is None:
+            rows = self.conn.execute(query)
+        else:
+            character_ids = list(character_ids)
+            placeholders = ", ".join("?" * len(character_ids))
+            rows = self.conn.execute(query + f" WHERE c.id IN ({placeholders})", character_ids)
+
+        players = []
+        for row in rows:
+            player = dict(row)
+            player["is_main_spec"] = bool(player["is_main_spec"])
+            player["slot_types_needed"] = player["slot_types_needed"].split(",") if player["slot_types_needed"] else []
+            players.append(player)
+        return players
+
+    # ----- Log replay -----
+
+    def rebuild_counters(self):
+        """
+        Recompute character_counters and the clear count from loot_events alone.
+
+        items_needed isn't part of the log (it comes from the gear sheet
+        through set_needs()), so it's recomputed from the open needs.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM character_counters")
+            self.conn.execute(
+                """
+                INSERT INTO character_counters (character_id, last_award_clear, last_award_week, awards, items_needed)
+                SELECT c.id,
+                       COALESCE(e.last_clear, 0),
+                       e.last_award_week,
+                       COALESCE(e.awards, 0),
+                       COALESCE(n.items_needed, 0)
+                FROM characters c
+                LEFT JOIN (
+                    SELECT character_id,
+                           MAX(clear) AS last_clear,
+                           MAX(CASE WHEN kind = 'award' THEN week END) AS last_award_week,
+                           SUM(kind = 'award') AS awards
+                    FROM loot_events
+                    WHERE character_id IS NOT NULL
+                    GROUP BY character_id
+                ) e ON e.character_id = c.id
+                LEFT JOIN (
+                    SELECT character_id, SUM(count) AS items_needed FROM needs WHERE count > 0 GROUP BY character_id
+                ) n ON n.character_id = c.id
+                """
+            )
+            self.conn.execute(
+                "UPDATE loot_state SET value = (SELECT COUNT(*) FROM loot_events WHERE kind = 'clear') "
+                "WHERE name = 'clears'"
+            )
+
+    def open_needs(self, slot_type=None):
+        """
+        Needs that aren't filled yet, for every slot or only one.
+
+        Returns:
+            list[dict]: character_id, name, slot_type and count.
+        """
+        query = """
+            SELECT n.character_id, c.name, n.slot_type, n.count
+            FROM needs n JOIN characters c ON c.id = n.character_id
+            WHERE n.count > 0
+        """
+        if slot_type is None:
+            rows = self.conn.execute(query)
+        else:
+            rows = self.conn.execute(query + " AND n.slot_type = ?", (slot_type,))
+        return [dict(row) for row in rows]
+
+class AsyncLootDatabase:
+    """
+    Non-blocking access to a LootDatabase for bot handlers.
+
+    Has the same methods as LootDatabase, but each one is a coroutine that
+    runs the query on a single dedicated thread. One thread means the
+    connection is never used concurrently and writes are applied in the
+    order they were awaited, while the event loop keeps running.
+
+    Create one with `await AsyncLootDatabase.open(path)`: opening creates
+    the schema and migrates it, which is too slow to do on the event loop.
+    """
+
+    def __init__(self, db, executor):
+        self._db = db
+        self._executor = executor
+
+    @classmethod
+    async def open(cls, path=DEFAULT_DB_PATH):
+        """Open the database on its own thread, which then runs all of its queries."""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="loot-db")
+        loop = asyncio.get_running_loop()
+        try:
+            db = await loop.run_in_executor(executor, LootDatabase, path)
+        except BaseException:
+            executor.shutdown(wait=False)
+            raise
+        return cls(db, executor)
+
+    def __getattr__(self, name):
+        method = getattr(self._db, name)
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._db.close)
+        self._executor.shutdown()
+
+_database = None
+
+async def open_database(path=DEFAULT_DB_PATH):
+    """Open the bot's shared AsyncLootDatabase, once, before any handler needs it (e.g. in setup_hook)."""
+    global _database
+    if _database is None:
+        _database = await AsyncLootDatabase.open(path)
+    return _database
+
+def get_database():
+    """The bot's shared AsyncLootDatabase, opened by open_database()."""
+    if _database is None:
+        raise RuntimeError("The loot database isn't open; await open_database() first")
+    return _database
+
+async def close_database():
+    """Close the shared database, if it was ever opened."""
+    global _database
+    if _database is not None:
+        await _database.close()
+        _database = None
@@ -0,0 +1,135 @@
+# fakes.py
+"""
+A local stand-in for the parts of gspread the bot uses, for measuring and
+exercising sheet fetches without Google credentials or network access.
+
+    client = FakeGspreadClient(make_gear_sheet())
+    cog = GearSheetCog(bot, gspread_client=client)
+
+    # One tab per static
+    client = FakeGspreadClient({"Static A": make_gear_sheet(0), "Static B": make_gear_sheet(1)})
+
+Each call sleeps for a simulated round trip plus the time to transfer its
+JSON payload, and is counted in client.stats.
+"""
+import json
+import random
+import threading
+import time
+
+from gspread.utils import a1_range_to_grid_range
+
+# Simulated network: round trip per API call, Drive search on open-by-name, and bandwidth
+ROUND_TRIP = 0.12
+DRIVE_SEARCH = 0.35
+BYTES_PER_SECOND = 250_000
+
+GEAR_SLOTS = ["Weapon", "Off-hand", "Head", "Chest", "Gloves", "Pants", "Boots",
+              "Earring", "Necklace", "Bracelet", "Ring1", "Ring2"]
+GEAR_SOURCES = ["Savage", "Tome", "Tome Aug", "Crafted", "Extreme"]
+
+def make_gear_sheet(seed=0, rows=60, cols=24):
+    """
+    A gear sheet laid out like the real one: eight characters in two rows
+    of four, with the name at row 4/31, ilvl below it and gear from row 7/34,
+    BiS in B/G/L/Q and current gear in D/I/N/S. The other cells hold the
+    notes, checkboxes and formulas a real sheet is full of.
+    """
+    rng = random.Random(seed)
+    grid = [[rng.choice(["", "TRUE", "FALSE", "=SUM(...)", "note"]) for _ in range(cols)] for _ in range(rows)]
+    for block, (name_row, gear_row) in enumerate(((3, 6), (30, 33))):
+        for i, (bis_col, current_col) in enumerate(zip((1, 6, 11, 16), (3, 8, 13, 18))):
+            grid[name_row][bis_col] = f"Character {block * 4 + i + 1}"
+            grid[name_row + 1][bis_col] = str(rng.randint(730, 760))
+            for r, slot in enumerate(GEAR_SLOTS):
+                grid[gear_row + r][bis_col] = f"{rng.choice(GEAR_SOURCES[:3])} {slot}"
+                grid[gear_row + r][current_col] = f"{rng.choice(GEAR_SOURCES)} {slot}"
+    return grid
+
+class FakeStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.bytes = 0
+
+    def record(self, call, payload=None):
+        size = len(json.dumps(payload)) if payload is not None else 0
+        with self.lock:
+            self.calls[call] = self.calls.get(call, 0) + 1
+            self.bytes += size
+        return size
+
+    def as_dict(self):
+        return {"calls": dict(self.calls), "bytes": self.bytes}
+
+class FakeWorksheet:
+    def __init__(self, client, grid, title="Sheet1"):
+        self.client = client
+        self.grid = grid
+        self.title = title
+
+    def get_all_values(self):
+        values = [list(row) for row in self.grid]
+        self.client._transfer("get_all_values", values)
+        return values
+
+    def _range_values(self, a1):
+        box = a1_range_to_grid_range(a1)
+        rows = self.grid[box["startRowIndex"]:box["endRowIndex"]]
+        values = [row[box["startColumnIndex"]:box["endColumnIndex"]] for row in rows]
+        # Like the API, trailing empty cells and rows aren't returned
+        values = [row[:max((i + 1 for i, v in enumerate(row) if v), default=0)] for row in values]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def batch_get(self, ranges, **kwargs):
+        result = [self._range_values(a1) for a1 in ranges]
+        self.client._transfer("batch_get", result)
+        return result
+
+class FakeSpreadsheet:
+    def __init__(self, client, grids):
+        self.client = client
+        self.worksheets = {title: FakeWorksheet(client, grid, title) for title, grid in grids.items()}
+        self.sheet1 = next(iter(self.worksheets.values()))
+
+    def worksheet(self, title):
+        return self.worksheets[title]
+
+    def values_batch_get(self, ranges, params=None):
+        """Ranges like "'Sheet1'!B7:B18", answered in the API's {"valueRanges": [...]} shape."""
+        value_ranges = []
+        for a1 in ranges:
+            title, _, cells = a1.rpartition("!")
+            title = title[1:-1].replace("''", "'") if title.startswith("'") else title
+            values = self.worksheets[title]._range_values(cells)
+            value_ranges.append({"range": a1, "values": values} if values else {"range": a1})
+        response = {"valueRanges": value_ranges}
+        self.client._transfer("values_batch_get", response)
+        return response
+
+class FakeGspreadClient:
+    """
+    Answers open(), open_by_key() and worksheet reads from an in-memory grid,
+    or from {tab title: grid} for a spreadsheet with several tabs.
+    """
+
+    def __init__(self, grid, round_trip=ROUND_TRIP, drive_search=DRIVE_SEARCH, bytes_per_second=BYTES_PER_SECOND):
+        self.grids = grid if isinstance(grid, dict) else {"Sheet1": grid}
+        self.round_trip = round_trip
+        self.drive_search = drive_search
+        self.bytes_per_second = bytes_per_second
+        self.stats = FakeStats()
+
+    def _transfer(self, call, payload=None, extra=0.0):
+        size = self.stats.record(call, payload)
+        time.sleep(self.round_trip + extra + size / self.bytes_per_second)
+
+    def open(self, title):
+        self._transfer("open", extra=self.drive_search)
+        return FakeSpreadsheet(self, self.grids)
+
+    def open_by_key(self, key):
+        self._transfer("open_by_key")
+        return FakeSpreadsheet(self, self.grids)
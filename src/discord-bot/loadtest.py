@@ -0,0 +1,213 @@
+"""
+Load-test the bot's slash commands offline: fire a burst of concurrent
+commands at the real cogs, with stand-ins for Discord and Google Sheets.
+
+    python loadtest.py
+    python loadtest.py --requests 500 --concurrency 100 --sheet-latency 0.3
+    python loadtest.py --commands pullgear --refresh-ratio 0.2
+
+Each command's callback runs against a fake Interaction whose responses
+take --discord-latency seconds, like REST calls to Discord. The gear sheet
+is the fake gspread in fakes.py, and the loot database is a throwaway file,
+never the bot's own. Reports per-command latency (to the first response,
+and to the last), throughput, and how late the event loop ran while the
+burst was in flight.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+try:
+    import bot_config  # noqa: F401
+except ImportError:
+    # The cogs only need these names to import; nothing here talks to Discord or Google
+    sys.modules["bot_config"] = types.SimpleNamespace(
+        BOT_TOKEN="", SERVER_ID=0, SHEET_NAME="Gear Sheet", GOOGLE_CREDS_PATH="credentials.json"
+    )
+
+import discord
+from discord.ext import commands
+from bot_config import SERVER_ID
+
+import database
+from cogs.register import JOB_CHOICES
+from fakes import FakeGspreadClient, make_gear_sheet
+
+EXTENSIONS = ["cogs.crafting_request", "cogs.register", "cogs.pull_data", "cogs.assign_loot"]
+
+# How often the lag monitor wakes up (seconds); how late it wakes is the event loop's lag
+LAG_INTERVAL = 0.01
+
+# ----- Discord stand-ins -----
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def defer(self, **kwargs):
+        await self.interaction._respond(None)
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        await self.interaction._respond(content)
+        self._done = True
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        await self.interaction._respond(content)
+
+class FakeInteraction:
+    """Just what the cogs use of a discord.Interaction, recording when each response went out."""
+
+    def __init__(self, user_id, latency):
+        self.user = types.SimpleNamespace(id=user_id, name=f"user{user_id}")
+        self.latency = latency
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.started = time.perf_counter()
+        self.responses = []  # (seconds since started, content)
+
+    async def _respond(self, content):
+        await asyncio.sleep(self.latency)  # A round trip to Discord's API
+        self.responses.append((time.perf_counter() - self.started, content))
+
+    @property
+    def failed(self):
+        return any(isinstance(content, str) and content.startswith("❌") for _, content in self.responses)
+
+# ----- Commands -----
+
+def _command_args(name, i, rng, refresh_ratio):
+    """The arguments a user would pass to each command."""
+    if name == "pullgear":
+        return {"refresh": rng.random() < refresh_ratio}
+    if name == "register":
+        # Sometimes without a job, like re-registering a character to keep its job
+        return {"character_name": f"Character {i % 8 + 1}", "job": rng.choice(JOB_CHOICES + [None])}
+    if name == "assignloot":
+        return {"drops": rng.choice(["accessory, accessory", "head, hands, feet", "body, legs", "weapon"])}
+    return {}
+
+async def _run_command(bot, name, args, user_id, latency):
+    command = bot.tree.get_command(name, guild=discord.Object(id=SERVER_ID))
+    interaction = FakeInteraction(user_id, latency)
+    try:
+        await command.callback(command.binding, interaction, **args)
+        error = interaction.failed
+    except Exception as e:
+        print(f"/{name} raised {type(e).__name__}: {e}", file=sys.stderr)
+        error = True
+    first = interaction.responses[0][0] if interaction.responses else None
+    return name, first, time.perf_counter() - interaction.started, error
+
+async def _monitor_lag(lags, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(max(loop.time() - expected, 0.0))
+
+# ----- Reporting -----
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(int(len(sorted_values) * q), len(sorted_values) - 1)]
+
+def _summary(values):
+    values = sorted(values)
+    return "  ".join(f"p{int(q * 100)} {_percentile(values, q) * 1e3:7.1f}" for q in (0.5, 0.95, 0.99))
+
+def report(results, elapsed, lags, stats):
+    print(f"{len(results)} commands in {elapsed:.2f}s, {len(results) / elapsed:.1f} commands/s\n")
+    print(f"{'command':<14}{'count':>6}{'errors':>7}   first response (ms)                    done (ms)")
+    for name in sorted({name for name, *_ in results}):
+        rows = [r for r in results if r[0] == name]
+        firsts = [first for _, first, _, _ in rows if first is not None]
+        dones = [done for _, _, done, _ in rows]
+        errors = sum(error for *_, error in rows)
+        print(f"/{name:<13}{len(rows):>6}{errors:>7}   {_summary(firsts)}   {_summary(dones)}")
+
+    lags = sorted(lags)
+    print(f"\nEvent loop lag (ms): {_summary(lags)}  max {(lags[-1] if lags else 0) * 1e3:.1f}")
+    print(f"Sheet API calls: {stats.calls}, {stats.bytes / 1024:.1f} KiB")
+
+# ----- Entry point -----
+
+async def run(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        # The shared database the cogs use, on a throwaway file
+        await database.open_database(os.path.join(tmp, "loadtest.db"))
+
+        bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+        for ext in EXTENSIONS:
+            await bot.load_extension(ext)
+        client = FakeGspreadClient(
+            make_gear_sheet(args.seed),
+            round_trip=args.sheet_latency,
+            drive_search=args.sheet_latency * 3,  # Roughly the real ratio of a Drive search to a values call
+        )
+        bot.get_cog("GearSheetCog").gspread_client = client
+
+        if "assignloot" in args.commands:
+            # Everyone on the sheet registered, so there's a roster to solve
+            for i, choice in enumerate(rng.sample(JOB_CHOICES, 8)):
+                await database.get_database().add_player(i, f"Character {i + 1}", choice.value)
+
+        names = [args.commands[i % len(args.commands)] for i in range(args.requests)]
+        rng.shuffle(names)
+        limit = asyncio.Semaphore(args.concurrency)
+
+        async def fire(i, name):
+            async with limit:
+                return await _run_command(bot, name, _command_args(name, i, rng, args.refresh_ratio),
+                                          1000 + i, args.discord_latency)
+
+        lags, stop = [], asyncio.Event()
+        monitor = asyncio.create_task(_monitor_lag(lags, stop))
+        start = time.perf_counter()
+        # The cogs print a line per command; keep them out of the report unless asked
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+            results = await asyncio.gather(*(fire(i, name) for i, name in enumerate(names)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+
+        report(results, elapsed, lags, client.stats)
+
+        for ext in EXTENSIONS:
+            await bot.unload_extension(ext)
+        await database.close_database()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the bot's slash commands offline.")
+    parser.add_argument("--requests", type=int, default=200, help="Commands to fire in total")
+    parser.add_argument("--concurrency", type=int, default=50, help="Commands in flight at once")
+    parser.add_argument("--commands", default="pullgear,register,craft_request",
+                        help="Comma-separated commands to mix: pullgear, register, craft_request, assignloot")
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="Seconds per response sent to Discord")
+    parser.add_argument("--sheet-latency", type=float, default=0.12, help="Seconds per Google Sheets API round trip")
+    parser.add_argument("--refresh-ratio", type=float, default=0.0, help="Share of /pullgear calls that force a refresh")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show what the cogs print while handling commands")
+    args = parser.parse_args()
+    args.commands = [name.strip().lstrip("/") for name in args.commands.split(",") if name.strip()]
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
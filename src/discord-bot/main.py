@@ -1,33 +1,104 @@
+import time
+_started = time.perf_counter()
+
+import hashlib
+import json
+import os
+
 import discord
 from discord.ext import commands
+import bot_config
 from bot_config import BOT_TOKEN, SERVER_ID
+import database
 
 GUILD_ID = discord.Object(id=SERVER_ID)
 
+# Hash of the last command tree synced to the guild; the tree is only synced again when it changes
+COMMAND_HASH_PATH = getattr(
+    bot_config, "COMMAND_HASH_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".command_tree_hash")
+)
+
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
 
+def command_tree_hash(tree):
+    """
+    A hash of everything Discord knows about the guild's commands: names,
+    options, descriptions, etc., and which application and guild they're
+    synced to, so switching either one still syncs.
+    """
+    definitions = [command.to_dict(tree) for command in tree.get_commands(guild=GUILD_ID)]
+    definitions.sort(key=lambda command: (command["type"], command["name"]))
+    payload = {"application_id": tree.client.application_id, "guild_id": SERVER_ID, "commands": definitions}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
 class Client(commands.Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.startup_timings = [("imports", time.perf_counter() - _started)]
+        self._ready_start = None
+
+    def _timed(self, step, start):
+        self.startup_timings.append((step, time.perf_counter() - start))
+
     async def setup_hook(self):
+        # Open the loot database before any command can use it, off the event loop
+        start = time.perf_counter()
+        await database.open_database()
+        self._timed("open database", start)
+
         # Load cogs on startup
         for ext in [
             "cogs.crafting_request",
             "cogs.register",
-            "cogs.pull_data"
+            "cogs.pull_data",
+            "cogs.assign_loot"
         ]:
+            start = time.perf_counter()
             await self.load_extension(ext)
+            self._timed(f"load {ext}", start)
 
-        # Guild-based slash command sync
+        # Guild-based slash command sync, only when the commands changed since the last one
+        start = time.perf_counter()
+        tree_hash = command_tree_hash(self.tree)
         try:
-            synced = await self.tree.sync(guild=GUILD_ID)
-            print(f'Synced {len(synced)} commands to guild {GUILD_ID}')
-        except Exception as e:
-            print(f'Error syncing commands: {e}')
+            with open(COMMAND_HASH_PATH) as f:
+                synced_hash = f.read().strip()
+        except OSError:
+            synced_hash = None
+
+        if tree_hash == synced_hash:
+            print('Commands unchanged since the last sync, skipping it')
+            self._timed("sync (skipped)", start)
+        else:
+            try:
+                synced = await self.tree.sync(guild=GUILD_ID)
+                print(f'Synced {len(synced)} commands to guild {GUILD_ID}')
+                with open(COMMAND_HASH_PATH, "w") as f:
+                    f.write(tree_hash)
+            except Exception as e:
+                print(f'Error syncing commands: {e}')
+            self._timed("sync", start)
+
+        self._ready_start = time.perf_counter()
 
     async def on_ready(self):
         print(f'Logged on as {self.user}')
+        # on_ready fires again after reconnects; only the first one is part of startup
+        if self._ready_start is not None:
+            self._timed("connect", self._ready_start)
+            self._ready_start = None
+            total = time.perf_counter() - _started
+            steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in self.startup_timings)
+            print(f'Started in {total:.2f}s: {steps}')
+
+    async def close(self):
+        await super().close()
+        await database.close_database()
 
 client = Client(command_prefix="!", intents=intents)
 
-client.run(BOT_TOKEN)
\ No newline at end of file
+# Guarded so the solver's worker processes can import this file without starting a second bot
+if __name__ == "__main__":
+    client.run(BOT_TOKEN)
\ No newline at end of file
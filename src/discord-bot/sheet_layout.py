@@ -0,0 +1,175 @@
+# sheet_layout.py
+"""
+Where everything lives on a gear sheet, and the parser compiled from it.
+
+A layout is plain data, so a sheet with a different shape, or a
+spreadsheet with one tab per static, only needs a different layout
+(SHEET_LAYOUT in bot_config), not code changes:
+
+    {
+        "tabs": [None],                  # worksheet titles; None is the first tab
+        "gear_slots": [...],             # slot names, one row each from first_gear_row down
+        "slot_types": {...},             # gear slot -> the loot calculator's slot type
+        "blocks": [                      # rows of characters sharing the same row numbers
+            {
+                "name_row": 4, "ilvl_row": 5, "first_gear_row": 7,
+                "characters": [
+                    {"name_col": "B", "ilvl_col": "B", "bis_col": "B", "current_col": "D"},
+                    ...
+                ],
+            },
+        ],
+    }
+
+Rows are 1-indexed like the sheet itself.
+"""
+import hashlib
+import json
+
+GEAR_SLOT_NAMES = [
+    "Weapon", "Off-hand", "Head", "Chest", "Gloves", "Pants", "Boots",
+    "Earring", "Necklace", "Bracelet", "Ring1", "Ring2"
+]
+
+# The loot calculator's slot type of each gear slot, i.e. which coffers it drops from
+GEAR_SLOT_TYPES = {
+    "Weapon": "weapon", "Off-hand": "weapon",
+    "Head": "head", "Chest": "body", "Gloves": "hands", "Pants": "legs", "Boots": "feet",
+    "Earring": "accessory", "Necklace": "accessory", "Bracelet": "accessory",
+    "Ring1": "accessory", "Ring2": "accessory",
+}
+
+# Four characters per block: BiS in B/G/L/Q, current gear two columns to the right
+_CHARACTER_COLUMNS = [
+    {"name_col": bis, "ilvl_col": bis, "bis_col": bis, "current_col": current}
+    for bis, current in (("B", "D"), ("G", "I"), ("L", "N"), ("Q", "S"))
+]
+
+DEFAULT_LAYOUT = {
+    "tabs": [None],
+    "gear_slots": GEAR_SLOT_NAMES,
+    "slot_types": GEAR_SLOT_TYPES,
+    "blocks": [
+        {"name_row": 4, "ilvl_row": 5, "first_gear_row": 7, "characters": _CHARACTER_COLUMNS},     # Characters 1-4
+        {"name_row": 31, "ilvl_row": 32, "first_gear_row": 34, "characters": _CHARACTER_COLUMNS},  # Characters 5-8
+    ],
+}
+
+# Ranges fetched per character, in this order
+_NAME, _ILVL, _CURRENT, _BIS = range(4)
+RANGES_PER_CHARACTER = 4
+
+def _column_index(column):
+    """Zero-indexed column of a column name, e.g. "B" -> 1, "AA" -> 26."""
+    index = 0
+    for letter in column.upper():
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+def _quote_tab(title):
+    return "'" + title.replace("'", "''") + "'"
+
+class SheetParser:
+    """
+    A layout compiled into the ranges to fetch and how to read them back.
+
+    Every character becomes four fixed ranges (name, ilvl, current gear,
+    BiS gear), so parse() reads all characters in a single pass over the
+    fetched ranges. Each character's raw cells are hashed; characters whose
+    cells haven't changed since the previous parse() reuse their earlier
+    result instead of being parsed again. Every character is still returned,
+    flagged with whether it changed, since callers like /assignloot need the
+    whole roster rather than only what changed.
+    """
+
+    def __init__(self, layout=DEFAULT_LAYOUT):
+        self.gear_slots = tuple(layout["gear_slots"])
+        self.tabs = list(layout.get("tabs") or [None])
+        num_slots = len(self.gear_slots)
+
+        # (tab, block, position) for each character, and its four ranges as
+        # (column letter, first row, last row), the same on every tab
+        positions = []
+        boxes = []
+        for b, block in enumerate(layout["blocks"]):
+            first, last = block["first_gear_row"], block["first_gear_row"] + num_slots - 1
+            for c, columns in enumerate(block["characters"]):
+                positions.append((b, c))
+                boxes.extend([
+                    (columns["name_col"], block["name_row"], block["name_row"]),
+                    (columns["ilvl_col"], block["ilvl_row"], block["ilvl_row"]),
+                    (columns["current_col"], first, last),
+                    (columns["bis_col"], first, last),
+                ])
+        self.characters = [(tab, b, c) for tab in self.tabs for b, c in positions]
+        self._boxes = boxes
+        self._cells = [f"{col}{first}:{col}{last}" for col, first, last in boxes]
+        self._seen = {}  # (tab, block, position) -> (hash of its cells, parsed character)
+
+    def ranges(self, first_tab_title):
+        """A1 ranges for one batched values call, in the order parse() expects them."""
+        ranges = []
+        for tab in self.tabs:
+            title = _quote_tab(first_tab_title if tab is None else tab)
+            ranges.extend(f"{title}!{cells}" for cells in self._cells)
+        return ranges
+
+    def ranges_from_grid(self, grid):
+        """Cut one tab's ranges out of its full grid, e.g. from get_all_values()."""
+        value_ranges = []
+        for col, first, last in self._boxes:
+            index = _column_index(col)
+            value_ranges.append([row[index:index + 1] for row in grid[first - 1:last]])
+        return value_ranges
+
+    def parse(self, value_ranges):
+        """
+        Read every character out of the fetched ranges.
+
+        Args:
+            value_ranges (list[list[list[str]]]): The values of each range from ranges(),
+                in order, as returned by the Sheets API (trailing empty cells may be missing).
+
+        Returns:
+            list[dict]: One dict per character that has any cells filled in
+            and a name: "name" and "ilvl" ("Unknown" if their cell is missing),
+            "current" and "bis" ({slot: item}, "Empty" for blank cells), "tab"
+            (the layout's tab, None for the first one) and "changed" (False if
+            its cells are identical to the previous parse()).
+        """
+        characters = []
+        num_slots = len(self.gear_slots)
+        for i, key in enumerate(self.characters):
+            raw = value_ranges[i * RANGES_PER_CHARACTER:(i + 1) * RANGES_PER_CHARACTER]
+            digest = hashlib.blake2b(json.dumps(raw).encode(), digest_size=16).digest()
+
+            seen = self._seen.get(key)
+            if seen is not None and seen[0] == digest:
+                character = seen[1]
+                changed = False
+            else:
+                character = self._parse_character(raw, key[0], num_slots)
+                self._seen[key] = (digest, character)
+                changed = True
+
+            # A slot with nothing filled in at all is nobody, not an "Unknown"
+            if character["name"] and any(raw):
+                characters.append({**character, "changed": changed})
+        return characters
+
+    def _parse_character(self, raw, tab, num_slots):
+        def cell(values):
+            return values[0][0] if values and values[0] else "Unknown"
+
+        def column(values):
+            cells = [row[0] if row else "" for row in values[:num_slots]]
+            cells += [""] * (num_slots - len(cells))
+            return {slot: value or "Empty" for slot, value in zip(self.gear_slots, cells)}
+
+        return {
+            "name": cell(raw[_NAME]),
+            "ilvl": cell(raw[_ILVL]),
+            "current": column(raw[_CURRENT]),
+            "bis": column(raw[_BIS]),
+            "tab": tab,
+        }
@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from main import assign_loot
+
+def parallel_map(func, args, max_workers=None, chunksize=None):
+    """
+    Apply a picklable function to every argument across a process pool.
+
+    Arguments are sent to the workers in chunks so that many small problems
+    don't pay the inter-process overhead one at a time. Small workloads (or
+    max_workers=1) run in the current process instead of starting a pool.
+
+    Args:
+        func (callable): Module-level function to call with each argument.
+        args (iterable): Arguments to map over.
+        max_workers (int | None): Worker processes to use. Defaults to the CPU count.
+        chunksize (int | None): Arguments per chunk. Defaults to spreading the
+            work over roughly four chunks per worker.
+
+    Returns:
+        list: func(arg) for every argument, in input order.
+    """
+    args = list(args)
+    workers = min(max_workers or os.cpu_count() or 1, len(args))
+
+    if workers <= 1:
+        return [func(arg) for arg in args]
+
+    if chunksize is None:
+        chunksize = max(1, len(args) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, args, chunksize=chunksize))
+
+def _solve_timed(problem):
+    """Solve one (players, items) problem and time how long it took."""
+    players, items = problem
+    start = time.perf_counter()
+    assignments = assign_loot(players, items)
+    return assignments, time.perf_counter() - start
+
+def assign_loot_batch(problems, max_workers=None, chunksize=None):
+    """
+    Solve many independent loot assignments in parallel.
+
+    Each problem is a (players, items) pair, exactly what assign_loot() takes,
+    e.g. one static's roster and that week's drops.
+
+    Args:
+        problems (iterable[tuple[list[Player], list[Item]]]): Problems to solve.
+        max_workers (int | None): Worker processes to use. Defaults to the CPU count.
+        chunksize (int | None): Problems sent to a worker at a time.
+
+    Returns:
+        list[dict]: One entry per problem, in input order, with keys:
+            - "assignments": the (player_name, item_name) pairs from assign_loot()
+            - "seconds": time spent solving that problem inside its worker
+    """
+    solved = parallel_map(_solve_timed, problems, max_workers=max_workers, chunksize=chunksize)
+    return [{"assignments": assignments, "seconds": seconds} for assignments, seconds in solved]
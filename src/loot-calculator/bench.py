@@ -0,0 +1,265 @@
+"""
+Benchmarks for the loot calculator.
+
+    python bench.py                          # check fixtures, run every scale
+    python bench.py --max-players 1000       # only the smaller scales
+    python bench.py --out results.json       # save the results
+    python bench.py --compare results.json   # show the change against a saved run
+
+Before timing anything, every solver backend has to reproduce the expected
+assignments for the fixed test sets in fixtures.py.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy
+
+from cache import AssignmentCache
+from components import assign_loot_decomposed
+from fixtures import EXPECTED, TEST_SETS
+from item import Item, SLOT_TYPES
+from main import assign_loot, build_sparse_weight_matrix, build_weight_matrix, calculate_weight
+from player import JOBS, Player
+from roster import Roster
+from session import LootSession
+
+# (players, items) for each benchmark scale
+SCALES = [
+    (8, 4),
+    (100, 16),
+    (1_000, 64),
+    (10_000, 128),
+    (100_000, 256),
+]
+
+# Skip anything that builds a dense players x items matrix above this size
+MAX_DENSE_CELLS = 10_000_000
+
+# Relative drop rates per slot type, roughly one raid week
+DROP_RATES = {"accessory": 4, "head": 1, "hands": 1, "feet": 1, "body": 1, "legs": 1, "weapon": 1}
+
+# ----- Synthetic data -----
+
+def generate_roster(num_players, seed=0):
+    """Random players with one to four slot types needed each."""
+    rng = random.Random(seed)
+    players = []
+    for i in range(num_players):
+        slots = set(rng.sample(SLOT_TYPES, rng.randint(1, 4)))
+        players.append(Player(
+            f"Player {i}",
+            rng.choice(JOBS),
+            rng.random() < 0.85,
+            rng.randint(0, 12),
+            len(slots) + rng.randint(0, 4),
+            slots,
+        ))
+    return players
+
+def generate_drops(num_items, seed=0):
+    """Random coffers, weighted by DROP_RATES."""
+    rng = random.Random(seed)
+    slots = rng.choices(list(DROP_RATES), weights=list(DROP_RATES.values()), k=num_items)
+    return [Item(f"{slot.title()} Coffer {i}", slot) for i, slot in enumerate(slots)]
+
+# ----- Backends -----
+
+def _solve_dense(players, items):
+    return assign_loot(players, items, backend="dense")
+
+def _solve_sparse(players, items):
+    return assign_loot(players, items, backend="sparse")
+
+def _solve_auto(players, items):
+    return assign_loot(players, items)
+
+def _solve_roster(players, items):
+    return assign_loot(Roster.from_players(players), items)
+
+def _solve_session(players, items):
+    return LootSession(players, items).assignments
+
+def _solve_cached(players, items):
+    cache = AssignmentCache()
+    cache.assign_loot(players, items)
+    return cache.assign_loot(players, items)  # Served from the cache
+
+# Checked against the fixtures like the others, but timed by _cache_hits() instead
+UNTIMED_BACKENDS = {"cache"}
+
+BACKENDS = {
+    "dense": _solve_dense,
+    "sparse": _solve_sparse,
+    "auto": _solve_auto,
+    "roster": _solve_roster,
+    "decomposed": assign_loot_decomposed,
+    "session": _solve_session,
+    "cache": _solve_cached,
+}
+
+# Backends that build the full dense matrix
+DENSE_BACKENDS = {"dense", "decomposed"}
+
+def check_fixtures():
+    """Run every backend on every test set; return a list of mismatches."""
+    failures = []
+    for name, solve in BACKENDS.items():
+        for number, (test_set, expected) in enumerate(zip(TEST_SETS, EXPECTED), start=1):
+            result = solve(test_set["players"], test_set["items"])
+            if sorted(result) != sorted(expected):
+                failures.append(f"{name} on test set {number}: got {result}, expected {expected}")
+    return failures
+
+# ----- Measurement -----
+
+def measure(func, min_time=0.2, max_repeat=7):
+    """Median wall time of func() and the peak memory traced during one extra call."""
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_repeat and (not times or time.perf_counter() - start < min_time):
+        t = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": statistics.median(times), "peak_bytes": peak}
+
+def _calculate_weight_calls(players, items, calls=10_000, seed=0):
+    """Time calculate_weight() per call over random (player, item) contender pairs."""
+    rng = random.Random(seed)
+    contenders = {slot: sum(1 for p in players if slot in p.slot_types_needed) for slot in SLOT_TYPES}
+    pairs = [(rng.choice(players), rng.choice(items)) for _ in range(calls)]
+    pairs = [(p, i, contenders[i.slot_type]) for p, i in pairs]
+
+    def run():
+        for player, item, count in pairs:
+            calculate_weight(player, item, count)
+
+    result = measure(run)
+    result["seconds"] /= len(pairs)
+    return result
+
+def _session_edits(players, items, edits=200, seed=0):
+    """Time single-field LootSession edits, per edit."""
+    rng = random.Random(seed)
+    session = LootSession(players, items)
+    names = [p.name for p in players]
+    changes = [
+        (rng.choice(names), {"bosses_without_loot": rng.randint(0, 12), "is_main_spec": rng.random() < 0.85})
+        for _ in range(edits)
+    ]
+
+    def run():
+        for name, fields in changes:
+            session.update_player(name, **fields)
+
+    result = measure(run, max_repeat=3)
+    result["seconds"] /= len(changes)
+    return result
+
+def _cache_hits(players, items):
+    """Time AssignmentCache hits: the cache is filled once, outside the timed calls."""
+    cache = AssignmentCache()
+    cache.assign_loot(players, items)
+    return measure(lambda: cache.assign_loot(players, items))
+
+def run_scale(num_players, num_items, seed=0):
+    """Every benchmark at one scale."""
+    players = generate_roster(num_players, seed)
+    items = generate_drops(num_items, seed)
+    dense_ok = num_players * num_items <= MAX_DENSE_CELLS
+
+    benchmarks = {}
+    if dense_ok:
+        benchmarks["build_weight_matrix"] = lambda: measure(lambda: build_weight_matrix(players, items))
+    benchmarks["build_sparse_weight_matrix"] = lambda: measure(lambda: build_sparse_weight_matrix(players, items))
+    benchmarks["calculate_weight"] = lambda: _calculate_weight_calls(players, items)
+    for name, solve in BACKENDS.items():
+        if name not in UNTIMED_BACKENDS and (dense_ok or name not in DENSE_BACKENDS):
+            benchmarks[f"assign_loot[{name}]"] = lambda solve=solve: measure(lambda: solve(players, items))
+    benchmarks["assign_loot[cache_hit]"] = lambda: _cache_hits(players, items)
+    benchmarks["session_edit"] = lambda: _session_edits(players, items)
+
+    results = []
+    for name, bench in benchmarks.items():
+        result = bench()
+        result.update({"benchmark": name, "players": num_players, "items": num_items})
+        results.append(result)
+        print(f"{name:<28} {num_players:>7} {num_items:>5} "
+              f"{result['seconds'] * 1e3:>12.4f} ms {result['peak_bytes'] / 1e6:>9.2f} MB")
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    """Print each benchmark's time relative to a saved run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {(r["benchmark"], r["players"], r["items"]): r for r in baseline["results"]}
+
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for r in results:
+        before = old.get((r["benchmark"], r["players"], r["items"]))
+        if before is None or not before["seconds"]:
+            continue
+        ratio = r["seconds"] / before["seconds"]
+        flag = "  SLOWER" if ratio > 1.1 else ("  faster" if ratio < 0.9 else "")
+        print(f"{r['benchmark']:<28} {r['players']:>7} {r['items']:>5} {ratio:>8.2f}x{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the loot calculator.")
+    parser.add_argument("--max-players", type=int, default=SCALES[-1][0], help="Largest scale to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a previously saved JSON file")
+    args = parser.parse_args()
+
+    failures = check_fixtures()
+    if failures:
+        print("Fixture mismatches:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"All {len(BACKENDS)} backends reproduce the {len(TEST_SETS)} fixture test sets.\n")
+
+    results = []
+    for num_players, num_items in SCALES:
+        if num_players <= args.max_players:
+            results.extend(run_scale(num_players, num_items, args.seed))
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
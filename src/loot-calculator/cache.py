@@ -0,0 +1,96 @@
+from collections import OrderedDict
+import constants
+from main import assign_loot
+
+def _player_key(player):
+    return (
+        player.name,
+        player.job.short,
+        bool(player.is_main_spec),
+        player.bosses_without_loot,
+        player.items_needed,
+        tuple(sorted(player.slot_types_needed)),
+    )
+
+def _item_key(item):
+    return (item.name, item.slot_type)
+
+def fingerprint(players, items):
+    """
+    Canonical, order-independent fingerprint of a roster and its drops.
+
+    Covers every Player field the weights read and every Item's name and
+    slot type. Shuffling the players or the items gives the same fingerprint.
+
+    Returns:
+        tuple: A hashable key.
+    """
+    return tuple(sorted(map(_player_key, players))), tuple(sorted(map(_item_key, items)))
+
+class AssignmentCache:
+    """
+    Bounded LRU cache in front of assign_loot().
+
+    Entries are keyed on fingerprint(players, items). The cache also tracks
+    the weights in constants.py and drops every entry as soon as they change.
+    A miss is solved exactly as given, so it matches assign_loot(). A later
+    hit with the lists in another order gets that first answer back; the
+    two can only differ in how ties were broken.
+    """
+
+    def __init__(self, maxsize=1024, solver=assign_loot):
+        self.maxsize = maxsize
+        self.solver = solver
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._weights_version = constants.weights_version()
+
+    def assign_loot(self, players, items):
+        """Same as assign_loot(players, items), served from the cache when possible."""
+        if constants.weights_version() != self._weights_version:
+            self._entries.clear()
+            self._weights_version = constants.weights_version()
+
+        key = fingerprint(players, items)
+        result = self._entries.get(key)
+        if result is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return list(result)
+
+        self.misses += 1
+        result = tuple(self.solver(players, items))
+        self._entries[key] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return list(result)
+
+    def clear(self):
+        """Drop every entry. The counters are kept."""
+        self._entries.clear()
+
+    def stats(self):
+        """Hit/miss/eviction counters and the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+_default_cache = AssignmentCache()
+
+def cached_assign_loot(players, items):
+    """assign_loot() through the module's shared AssignmentCache."""
+    return _default_cache.assign_loot(players, items)
+
+def cache_stats():
+    """Counters for the shared cache used by cached_assign_loot()."""
+    return _default_cache.stats()
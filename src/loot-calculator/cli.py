@@ -0,0 +1,238 @@
+"""
+Solve loot assignments for many statics from a file, streaming.
+
+    python cli.py league.jsonl --out assignments.jsonl
+    python cli.py league.csv --workers 4 > assignments.jsonl
+    cat league.jsonl | python cli.py - --format jsonl
+
+Input is one static per record.
+
+JSONL: one object per line,
+    {"static": "...", "players": [{"name", "job", "is_main_spec",
+     "bosses_without_loot", "items_needed", "slot_types_needed": [...]}, ...],
+     "items": [{"name", "slot_type"}, ...]}
+
+CSV: one row per player or item, with the rows of a static next to each other:
+    static,kind,name,job,is_main_spec,bosses_without_loot,items_needed,slot_types_needed,slot_type
+    A,player,Alice,WHM,true,2,3,head;weapon,
+    A,item,Head Coffer,,,,,,head
+
+Output is one JSON line per static, in input order:
+    {"static": "...", "assignments": [[player_name, item_name], ...]}
+or, if the static couldn't be read or solved, {"static": "...", "error": "..."}
+("static" is null for a JSONL line that isn't valid JSON). A bad record
+only fails itself; the rest of the input is still solved.
+Records are read, solved and written a few at a time, so memory stays
+flat however large the input is.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+
+from item import Item
+from main import assign_loot
+from player import Player
+
+# Records sent to a worker at a time, so small statics don't pay the IPC one by one
+CHUNK_SIZE = 64
+
+# Chunks in flight per worker: enough to keep workers busy, small enough to bound memory
+IN_FLIGHT_PER_WORKER = 4
+
+# Seconds between progress lines on stderr
+PROGRESS_INTERVAL = 5.0
+
+# Columns a CSV input must have, whether or not its rows use them
+CSV_COLUMNS = (
+    "static", "kind", "name", "job", "is_main_spec", "bosses_without_loot", "items_needed",
+    "slot_types_needed", "slot_type",
+)
+
+# ----- Reading -----
+
+def _error_record(static, e):
+    return {"static": static, "error": f"{type(e).__name__}: {e}"}
+
+def read_jsonl(lines):
+    """Yield one record per non-empty line, or an error record for a line that can't be parsed."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield _error_record(None, ValueError(f"line {number}, column {e.pos + 1}: {e.msg}"))
+            continue
+        if not isinstance(record, dict):
+            yield _error_record(None, TypeError(f"line {number}: expected an object, got {type(record).__name__}"))
+            continue
+        yield record
+
+def _parse_bool(value):
+    value = value.strip().lower()
+    if value in ("true", "yes", "y", "1"):
+        return True
+    if value in ("false", "no", "n", "0", ""):
+        return False
+    raise ValueError(f"Not a boolean: {value!r}")
+
+def _read_static(static, rows):
+    record = {"static": static, "players": [], "items": []}
+    for row in rows:
+        if None in row.values():
+            raise ValueError(f"Row {row['name']!r} in static {static!r} is missing cells")
+        kind = row["kind"].strip().lower()
+        if kind == "player":
+            record["players"].append({
+                "name": row["name"],
+                "job": row["job"],
+                "is_main_spec": _parse_bool(row["is_main_spec"]),
+                "bosses_without_loot": int(row["bosses_without_loot"]),
+                "items_needed": int(row["items_needed"]),
+                "slot_types_needed": [s.strip() for s in row["slot_types_needed"].split(";") if s.strip()],
+            })
+        elif kind == "item":
+            record["items"].append({"name": row["name"], "slot_type": row["slot_type"]})
+        else:
+            raise ValueError(f"Unknown row kind {row['kind']!r} in static {static!r}")
+    return record
+
+def read_csv(lines):
+    """
+    Yield one record per run of rows with the same static, or an error
+    record if its rows can't be parsed. A header without every column in
+    CSV_COLUMNS yields a single error record and nothing else.
+    """
+    reader = csv.DictReader(lines)
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        yield _error_record(None, ValueError(f"CSV header is missing columns: {', '.join(missing)}"))
+        return
+    for static, rows in groupby(reader, key=lambda row: row["static"]):
+        try:
+            yield _read_static(static, rows)
+        except (KeyError, ValueError) as e:
+            yield _error_record(static, e)
+
+READERS = {"jsonl": read_jsonl, "csv": read_csv}
+
+# ----- Solving -----
+
+def _field(fields, key, kind):
+    """fields[key], which has to be a kind (JSON's true and false don't count as ints)."""
+    value = fields[key]
+    if not isinstance(value, kind) or (isinstance(value, bool) and kind is not bool):
+        raise TypeError(f"{key!r} must be {kind.__name__}, not {type(value).__name__}: {value!r}")
+    return value
+
+def _read_player(p):
+    slot_types_needed = _field(p, "slot_types_needed", list)
+    for slot_type in slot_types_needed:
+        if not isinstance(slot_type, str):
+            raise TypeError(f"'slot_types_needed' must be a list of str, not containing {slot_type!r}")
+    return Player(
+        _field(p, "name", str),
+        _field(p, "job", str),
+        _field(p, "is_main_spec", bool),
+        _field(p, "bosses_without_loot", int),
+        _field(p, "items_needed", int),
+        set(slot_types_needed),
+    )
+
+def _solve_record(args):
+    """Build the players and items of one record and solve it; error records from reading pass through."""
+    record, backend = args
+    static = record.get("static")
+    if "error" in record:
+        return record
+    try:
+        players = [_read_player(p) for p in _field(record, "players", list)]
+        items = [Item(_field(i, "name", str), _field(i, "slot_type", str)) for i in _field(record, "items", list)]
+        return {"static": static, "assignments": assign_loot(players, items, backend=backend)}
+    except (KeyError, TypeError, ValueError) as e:
+        return _error_record(static, e)
+
+def _solve_chunk(chunk, backend):
+    return [_solve_record((record, backend)) for record in chunk]
+
+def solve_stream(records, backend="auto", max_workers=None, chunksize=CHUNK_SIZE):
+    """
+    Solve records as they arrive and yield the results in input order.
+
+    With more than one worker, records go to the pool in chunks, and at
+    most IN_FLIGHT_PER_WORKER chunks per worker are submitted ahead of the
+    oldest unfinished one, so neither the input nor the results pile up
+    in memory.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1:
+        for record in records:
+            yield _solve_record((record, backend))
+        return
+
+    records = iter(records)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while chunk := list(islice(records, chunksize)):
+            pending.append(pool.submit(_solve_chunk, chunk, backend))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+# ----- Entry point -----
+
+def _open_input(path):
+    if path == "-":
+        return sys.stdin
+    return open(path, newline="", encoding="utf-8")
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve loot assignments for many statics from a JSONL or CSV file.")
+    parser.add_argument("input", help="Input file, or - for stdin")
+    parser.add_argument("--format", choices=sorted(READERS), help="Input format. Defaults to the file extension")
+    parser.add_argument("--out", help="Output JSONL file. Defaults to stdout")
+    parser.add_argument("--workers", type=int, help="Worker processes. Defaults to the CPU count")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Records sent to a worker at a time")
+    parser.add_argument("--backend", choices=("auto", "dense", "sparse"), default="auto")
+    args = parser.parse_args()
+
+    input_format = args.format or os.path.splitext(args.input)[1].lstrip(".").lower()
+    if input_format not in READERS:
+        parser.error("Can't tell the input format; pass --format")
+
+    source = _open_input(args.input)
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    records = READERS[input_format](source)
+    results = solve_stream(records, backend=args.backend, max_workers=args.workers, chunksize=args.chunk_size)
+
+    solved = errors = 0
+    start = last_report = time.perf_counter()
+    try:
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+            solved += 1
+            errors += "error" in result
+
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL:
+                print(f"{solved} records, {solved / (now - start):.0f} records/s", file=sys.stderr)
+                last_report = now
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    rate = solved / elapsed if elapsed else 0.0
+    print(f"Solved {solved} records ({errors} errors) in {elapsed:.2f}s, {rate:.0f} records/s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from batch import parallel_map
+from constants import *
+from main import build_weight_matrix
+from profiling import count, set_value, stage
+
+# Components with at least this many cells are worth shipping to a worker process
+PARALLEL_MIN_CELLS = 250_000
+
+def split_components(players, items):
+    """
+    Reduce an assignment problem to its independent parts.
+
+    Players who need none of the dropped slot types, and items whose slot
+    type nobody needs, can never be part of a real assignment, so they are
+    dropped. What remains is split into connected components of the
+    "player needs slot type" graph: slot types that share a contender end
+    up together, and no player or item is shared between components.
+
+    Args:
+        players (list[Player]): Players being considered for loot.
+        items (list[Item]): Items being distributed.
+
+    Returns:
+        list[tuple[list[int], list[int]]]: For each component, the indices
+        into players and into items that belong to it.
+    """
+    dropped_slots = {item.slot_type for item in items}
+
+    # Union-find over slot types, joined by players who need more than one of them
+    parent = {slot: slot for slot in dropped_slots}
+
+    def find(slot):
+        while parent[slot] != slot:
+            parent[slot] = parent[parent[slot]]
+            slot = parent[slot]
+        return slot
+
+    contenders = []
+    needed_slots = set()
+    for index, player in enumerate(players):
+        wanted = dropped_slots.intersection(player.slot_types_needed)
+        if not wanted:
+            continue
+        contenders.append((index, wanted))
+        needed_slots |= wanted
+        first, *rest = wanted
+        for slot in rest:
+            parent[find(slot)] = find(first)
+
+    components = {}
+    for index, wanted in contenders:
+        root = find(next(iter(wanted)))
+        components.setdefault(root, ([], []))[0].append(index)
+    for index, item in enumerate(items):
+        if item.slot_type in needed_slots:
+            components[find(item.slot_type)][1].append(index)
+
+    return list(components.values())
+
+def _solve_matrix(matrix):
+    """Run the Hungarian algorithm on one component's weight matrix."""
+    return linear_sum_assignment(matrix)
+
+def assign_loot_decomposed(players, items, stats=None):
+    """
+    Assign loot like assign_loot(), but solve each independent component separately.
+
+    The weight matrix is only built for the players and items that survive
+    split_components(), and each component is solved on its own slice of it.
+    Large components are solved in parallel. The total weight of the result
+    is the same as the monolithic solve; when two assignments tie, either
+    may be returned.
+
+    Args:
+        players (list[Player]): Players being considered for loot.
+        items (list[Item]): Items being distributed.
+        stats (dict | None): If given, filled in with how much the problem shrank:
+            players/items/cells before and after reduction, the number of
+            components and the size of the largest one.
+
+    Returns:
+        list[tuple[str, str]]: (player_name, item_name) assignment pairs,
+        ordered by player like assign_loot().
+    """
+    with stage("split_components"):
+        components = split_components(players, items)
+
+    kept_players = sorted(i for rows, _ in components for i in rows)
+    kept_items = sorted(j for _, cols in components for j in cols)
+    player_pos = {index: pos for pos, index in enumerate(kept_players)}
+    item_pos = {index: pos for pos, index in enumerate(kept_items)}
+
+    # Dropped players don't need any dropped slot, so contender counts are unchanged
+    with stage("build_matrix"):
+        matrix = build_weight_matrix([players[i] for i in kept_players], [items[j] for j in kept_items])
+        sub_matrices = [
+            matrix[np.ix_([player_pos[i] for i in rows], [item_pos[j] for j in cols])]
+            for rows, cols in components
+        ]
+
+    largest = max((m.size for m in sub_matrices), default=0)
+    with stage("solve"):
+        if sum(m.size >= PARALLEL_MIN_CELLS for m in sub_matrices) > 1:
+            solutions = parallel_map(_solve_matrix, sub_matrices, chunksize=1)
+        else:
+            solutions = [_solve_matrix(m) for m in sub_matrices]
+    count("cells_evaluated", sum(m.size for m in sub_matrices))
+    set_value("components", len(components))
+    set_value("largest_component_cells", largest)
+
+    pairs = []
+    for (rows, cols), sub_matrix, (row_ind, col_ind) in zip(components, sub_matrices, solutions):
+        for r, c in zip(row_ind, col_ind):
+            # Real cells are the ones where the player needs the slot, however large the weight
+            if items[cols[c]].slot_type in players[rows[r]].slot_types_needed:
+                pairs.append((rows[r], cols[c]))
+    pairs.sort()
+
+    if stats is not None:
+        stats.update({
+            "players_before": len(players),
+            "items_before": len(items),
+            "cells_before": len(players) * len(items),
+            "players_after": len(kept_players),
+            "items_after": len(kept_items),
+            "cells_after": sum(m.size for m in sub_matrices),
+            "components": len(components),
+            "largest_component_cells": largest,
+        })
+
+    return [(players[r].name, items[c].name) for r, c in pairs]
@@ -1,5 +1,12 @@
 from player import Job
 
+__all__ = [
+    "OFF_SPEC_PENALTY",
+    "ACCESSORY", "BODY", "FEET", "HANDS", "HEAD", "LEGS", "WEAPON", "SLOT_WEIGHTS",
+    "FINAL_ITEM", "ITEMS_NEEDED_MULT", "RECENT_LOOT_PENALTY_MULT", "CONTEST_PENALTY",
+    "UNASSIGNABLE", "JOB_PRIORITY",
+]
+
 # Weights for priority calculation
 # All of these can be tweaked to adjust behavior.
 
@@ -34,6 +41,12 @@ ITEMS_NEEDED_MULT = -5
 # Multiplier for how many bosses the player has gone without receiving loot
 RECENT_LOOT_PENALTY_MULT = -15
 
+# Cost added for every other player contending for the same slot
+CONTEST_PENALTY = 25
+
+# Weight for a player who doesn't need the item's slot at all ("don't pick me")
+UNASSIGNABLE = 999999
+
 # Job Weights - Melee and casters get highest priority, healers get lowest
 JOB_PRIORITY = {
     Job.PLD: -20,
@@ -56,4 +69,40 @@ JOB_PRIORITY = {
     Job.BLM: -40,
     Job.SMN: -35,
     Job.RDM: -35,
-    Job.PCT: -40 }
\ No newline at end of file
+    Job.PCT: -40 }
+
+
+# ----- Runtime changes -----
+# To change weights while running, call set_weights() rather than assigning
+# to this module or editing the dicts: code that compiles them (see
+# tables.py) only recompiles when weights_version() moves.
+
+# Weights set_weights() can change: scalars, and tables changed key by key
+SCALAR_WEIGHTS = ("OFF_SPEC_PENALTY", "RECENT_LOOT_PENALTY_MULT", "ITEMS_NEEDED_MULT", "FINAL_ITEM", "CONTEST_PENALTY")
+TABLE_WEIGHTS = ("JOB_PRIORITY", "SLOT_WEIGHTS")
+
+_version = 0
+
+def weights_version():
+    """Counter that goes up every time set_weights() changes the weights."""
+    return _version
+
+def set_weights(**weights):
+    """
+    Change weights at runtime, e.g. set_weights(FINAL_ITEM=-80, JOB_PRIORITY={Job.WHM: -30}).
+
+    Takes the same keys as a tuning configuration: any of SCALAR_WEIGHTS,
+    and TABLE_WEIGHTS as dicts that only replace the keys they mention.
+    """
+    global _version
+    unknown = set(weights) - set(SCALAR_WEIGHTS) - set(TABLE_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown weights: {sorted(unknown)}")
+
+    module = globals()
+    for name, value in weights.items():
+        if name in TABLE_WEIGHTS:
+            module[name].update(value)
+        else:
+            module[name] = value
+    _version += 1
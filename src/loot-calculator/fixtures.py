@@ -0,0 +1,156 @@
+from player import Player, Job
+from item import Item
+
+# Fixed rosters and drops with known-good assignments.
+# Every solver backend has to reproduce EXPECTED for every test set.
+
+# Test Set 1: Small group with simple needs
+test_set_1 = {
+    "players": [
+        Player("Alice", Job.WHM, True, 2, 3, {"weapon", "head"}),
+        Player("Bob", Job.DRG, True, 1, 2, {"weapon"}),
+        Player("Charlie", Job.BRD, False, 3, 4, {"head", "body"}),
+    ],
+    "items": [
+        Item("Weapon Coffer", "weapon"),
+        Item("Head Coffer", "head"),
+    ]
+}
+
+# Test Set 2: Medium group with competing needs
+test_set_2 = {
+    "players": [
+        Player("Diana", Job.SGE, True, 5, 6, {"accessory", "legs", "feet"}),
+        Player("Eve", Job.RDM, True, 0, 1, {"accessory"}),
+        Player("Frank", Job.SAM, True, 4, 5, {"legs", "hands"}),
+        Player("Grace", Job.DNC, False, 2, 3, {"accessory", "feet"}),
+        Player("Henry", Job.PLD, True, 3, 4, {"legs"}),
+    ],
+    "items": [
+        Item("Accessory Coffer", "accessory"),
+        Item("Legs Coffer", "legs"),
+        Item("Feet Coffer", "feet"),
+    ]
+}
+
+# Test Set 3: Large group with diverse needs
+test_set_3 = {
+    "players": [
+        Player("Ivan", "warrior", True, 7, 8, {"weapon", "body", "head"}),
+        Player("Jane", "summoner", True, 1, 2, {"weapon"}),
+        Player("Kyle", Job.MNK, False, 6, 7, {"body", "hands", "feet"}),
+        Player("Laura", Job.AST, True, 2, 3, {"head", "accessory"}),
+        Player("Mike", Job.GNB, True, 4, 5, {"weapon", "body"}),
+        Player("Nina", Job.MCH, False, 5, 6, {"hands", "feet"}),
+        Player("Oscar", Job.NIN, True, 3, 4, {"head"}),
+        Player("Paula", Job.PCT, True, 0, 1, {"accessory"}),
+    ],
+    "items": [
+        Item("Weapon Coffer", "weapon"),
+        Item("Body Coffer", "body"),
+        Item("Head Coffer", "head"),
+        Item("Accessory Coffer", "accessory"),
+    ]
+}
+
+# Test Set 4: Edge case - everyone needs the same item
+test_set_4 = {
+    "players": [
+        Player("Quinn", Job.DRK, True, 8, 7, {"weapon", "legs"}),
+        Player("Rachel", Job.SAM, True, 6, 5, {"weapon", "body"}),
+        Player("Steve", Job.BLM, False, 4, 6, {"weapon", "hands"}),
+        Player("Tina", Job.RPR, True, 2, 3, {"weapon"}),
+    ],
+    "items": [
+        Item("Weapon Coffer", "weapon"),
+        Item("Legs Coffer", "legs"),
+    ]
+}
+
+# Test Set 5: Mixed priorities with multiple items
+test_set_5 = {
+    "players": [
+        Player("Uma", Job.WHM, True, 10, 8, {"hands", "feet", "legs", "body"}),
+        Player("Victor", Job.MCH, False, 1, 2, {"hands"}),
+        Player("Wendy", Job.VPR, True, 5, 6, {"feet", "legs"}),
+        Player("Xavier", Job.GNB, True, 0, 1, {"body"}),
+        Player("Yara", Job.RDM, True, 3, 4, {"hands", "feet"}),
+        Player("Zack", Job.DRG, False, 7, 8, {"legs", "body"}),
+    ],
+    "items": [
+        Item("Hands Coffer", "hands"),
+        Item("Feet Coffer", "feet"),
+        Item("Legs Coffer", "legs"),
+        Item("Body Coffer", "body"),
+    ]
+}
+
+# Test Set 6: No overlapping needs
+test_set_6 = {
+    "players": [
+        Player("Aaron", Job.SAM, True, 4, 5, {"weapon"}),
+        Player("Beth", Job.SCH, True, 3, 4, {"head"}),
+        Player("Carl", Job.BRD, True, 2, 3, {"accessory"}),
+    ],
+    "items": [
+        Item("Weapon Coffer", "weapon"),
+        Item("Head Coffer", "head"),
+        Item("Accessory Coffer", "accessory"),
+    ]
+}
+
+# Test Set 7: All off-spec players
+test_set_7 = {
+    "players": [
+        Player("Derek", Job.DRK, False, 5, 6, {"body", "legs"}),
+        Player("Emma", Job.PCT, False, 4, 5, {"body", "hands"}),
+        Player("Felix", Job.NIN, False, 6, 7, {"legs", "feet"}),
+        Player("Gina", Job.AST, False, 3, 4, {"hands"}),
+    ],
+    "items": [
+        Item("Body Coffer", "body"),
+        Item("Legs Coffer", "legs"),
+        Item("Hands Coffer", "hands"),
+    ]
+}
+
+# Test Set 8: Varied item needs with multiple slot types per player
+test_set_8 = {
+    "players": [
+        Player("Hugo", Job.RPR, True, 9, 8, {"weapon", "head", "body", "accessory"}),
+        Player("Iris", Job.DNC, True, 2, 3, {"head", "feet"}),
+        Player("Jack", Job.PLD, False, 5, 6, {"body", "hands", "legs"}),
+        Player("Kelly", Job.SMN, True, 1, 2, {"accessory"}),
+        Player("Liam", Job.DRG, True, 7, 7, {"weapon", "legs"}),
+        Player("Mona", Job.WHM, False, 4, 5, {"hands", "feet"}),
+    ],
+    "items": [
+        Item("Weapon Coffer", "weapon"),
+        Item("Head Coffer", "head"),
+        Item("Hands Coffer", "hands"),
+        Item("Accessory Coffer", "accessory"),
+    ]
+}
+
+TEST_SETS = [
+    test_set_1,
+    test_set_2,
+    test_set_3,
+    test_set_4,
+    test_set_5,
+    test_set_6,
+    test_set_7,
+    test_set_8,
+]
+
+# (player_name, item_name) pairs for each test set, in player order
+EXPECTED = [
+    [('Alice', 'Head Coffer'), ('Bob', 'Weapon Coffer')],
+    [('Diana', 'Feet Coffer'), ('Eve', 'Accessory Coffer'), ('Henry', 'Legs Coffer')],
+    [('Ivan', 'Body Coffer'), ('Jane', 'Weapon Coffer'), ('Oscar', 'Head Coffer'), ('Paula', 'Accessory Coffer')],
+    [('Quinn', 'Legs Coffer'), ('Rachel', 'Weapon Coffer')],
+    [('Uma', 'Hands Coffer'), ('Wendy', 'Legs Coffer'), ('Xavier', 'Body Coffer'), ('Yara', 'Feet Coffer')],
+    [('Aaron', 'Weapon Coffer'), ('Beth', 'Head Coffer'), ('Carl', 'Accessory Coffer')],
+    [('Derek', 'Body Coffer'), ('Emma', 'Hands Coffer'), ('Felix', 'Legs Coffer')],
+    [('Hugo', 'Head Coffer'), ('Jack', 'Hands Coffer'), ('Kelly', 'Accessory Coffer'), ('Liam', 'Weapon Coffer')],
+]
@@ -0,0 +1,166 @@
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import csr_matrix
+from main import _player_arrays, _slot_columns, _sparse_weights_from_arrays, _unassignable_for
+from roster import Roster
+
+def _group_items(items, quantities):
+    """Merge repeated items (same name and slot type) into one entry with a quantity."""
+    if quantities is None:
+        quantities = [1] * len(items)
+    if len(quantities) != len(items):
+        raise ValueError("quantities must have one entry per item")
+
+    index = {}
+    grouped, counts = [], []
+    for item, quantity in zip(items, quantities):
+        if quantity < 0:
+            raise ValueError(f"Negative quantity for {item.name!r}")
+        key = (item.name, item.slot_type)
+        if key not in index:
+            index[key] = len(grouped)
+            grouped.append(item)
+            counts.append(0)
+        counts[index[key]] += quantity
+    return grouped, np.array(counts, dtype=np.int64)
+
+def _player_capacities(names, capacities):
+    """Per-player caps from an int, a list, or a {name: cap} dict (missing names get 1)."""
+    if capacities is None:
+        capacities = 1
+    if isinstance(capacities, dict):
+        caps = np.array([capacities.get(name, 1) for name in names], dtype=np.int64)
+    elif np.isscalar(capacities):
+        caps = np.full(len(names), capacities, dtype=np.int64)
+    else:
+        caps = np.asarray(capacities, dtype=np.int64)
+        if caps.shape != (len(names),):
+            raise ValueError("capacities must have one entry per player")
+    if (caps < 0).any():
+        raise ValueError("Player capacities can't be negative")
+    return caps
+
+def assign_loot_flow(players, items, quantities=None, capacities=None):
+    """
+    Assign loot with item quantities and per-player caps as one min-cost flow.
+
+    Every item of a slot type weighs the same for a given player, so the
+    flow runs from one node per dropped slot type, supplying as many copies
+    as dropped of that type, to the players, who each take at most their
+    cap. There is an edge only where the player needs the slot type, and
+    its cost is the assign_loot() weight minus an offset above any total of
+    real weights, so that handing out more items always wins over a lower
+    total weight, exactly like the sentinel cells of the dense matrix. The flow is solved as a
+    linear program with HiGHS; the constraint matrix is totally unimodular,
+    so the optimum is integral. The copies of each slot type are then dealt
+    out in item order to its players in roster order.
+
+    Equal-weight alternatives are broken towards players earlier in the
+    roster, then towards earlier players getting the slot types listed
+    first among the drops: costs are scaled to integers with the tie-break
+    added, and with integer costs every reduced cost HiGHS looks at is a
+    whole number, far outside its tolerances. Scaled costs have to stay
+    exactly representable as floats (below about 2**53 in total), so on
+    very large rosters the slot tier is dropped, and if even the roster
+    tier doesn't fit, equal-weight ties go whichever way HiGHS finds them.
+    With no
+    quantities or caps this gives the same assignments as assign_loot() on
+    the fixture test sets, and in general the same total weight as
+    repeating each item's column per copy and each player's row per unit
+    of cap.
+
+    Args:
+        players (list[Player] | Roster): Players being considered for loot.
+        items (list[Item]): Items being distributed. Repeated items (same
+            name and slot type) are merged and their quantities added.
+        quantities (list[int] | None): Copies of each item. Defaults to 1 each.
+        capacities (int | list[int] | dict[str, int] | None): Most items each
+            player may receive, as one cap for everyone, one per player, or
+            by player name (players not listed get 1). Defaults to 1.
+
+    Returns:
+        list[tuple[str, str]]: (player_name, item_name) pairs, one per copy
+        handed out, ordered by player. Copies nobody needs are left out.
+    """
+    names = players.names if isinstance(players, Roster) else [player.name for player in players]
+    items, counts = _group_items(items, quantities)
+    caps = _player_capacities(names, capacities)
+
+    slot_types, item_slots = _slot_columns(items)
+    num_players, num_slots = len(names), len(slot_types)
+    supply = np.bincount(item_slots, weights=counts, minlength=num_slots).astype(np.int64)
+
+    # One column per slot type: the weight of any of its items for each contender
+    weights = _sparse_weights_from_arrays(
+        **_player_arrays(players, slot_types), item_slots=np.arange(num_slots)
+    ).tocoo()
+
+    # Only edges that can carry flow
+    usable = (caps[weights.row] > 0) & (supply[weights.col] > 0)
+    rows, cols, costs = weights.row[usable], weights.col[usable], weights.data[usable]
+    if not len(rows):
+        return []
+
+    # A slot type only ever needs its cheapest contenders whose caps add up to
+    # every copy dropped: anyone further down could hand their copy to one of
+    # them that still has room, for the same weight or less.
+    order = np.lexsort((rows, costs, cols))
+    rows, cols, costs = rows[order], cols[order], costs[order]
+    room_before = np.cumsum(caps[rows]) - caps[rows]
+    slot_starts = np.searchsorted(cols, cols)
+    keep = room_before - room_before[slot_starts] < supply.sum()
+    rows, cols, costs = rows[keep], cols[keep], costs[keep]
+
+    num_edges = len(rows)
+    edges = np.arange(num_edges)
+    constraints = csr_matrix(
+        (
+            np.ones(2 * num_edges),
+            (np.concatenate((rows, num_players + cols)), np.concatenate((edges, edges))),
+        ),
+        shape=(num_players + num_slots, num_edges),
+    )
+    # Larger than any real total, however large the weights, so every edge is worth using
+    offset = _unassignable_for(costs, int(min(supply.sum(), caps.sum())))
+    # Integer tie-breaks, each tier summing to less than one unit of the tier above over any
+    # assignment: earlier rows, then earlier rows on earlier slot columns. The finest one whose
+    # costs are still exact as floats is used.
+    total = int(supply.sum())
+    row_scale = (num_players - 1) * total + 1
+    pair_scale = (num_players - 1) * (num_slots - 1) * total + 1
+    largest = (offset + int(np.abs(costs).max())) * (total + 1)
+    if largest * row_scale * pair_scale < 2**53:
+        objective = (costs - offset) * row_scale * pair_scale + rows * pair_scale + (num_players - 1 - rows) * cols
+    elif largest * row_scale < 2**53:
+        objective = (costs - offset) * row_scale + rows
+    else:
+        objective = costs - offset
+    result = linprog(
+        objective.astype(float),
+        A_ub=constraints,
+        b_ub=np.concatenate((caps, supply)),
+        bounds=np.column_stack((np.zeros(num_edges), np.minimum(caps[rows], supply[cols]))),
+        method="highs",
+    )
+    if not result.success:
+        raise RuntimeError(f"Loot flow could not be solved: {result.message}")
+
+    flow = np.rint(result.x).astype(np.int64)
+    used = np.flatnonzero(flow)
+    used = used[np.lexsort((rows[used], cols[used]))]
+
+    # Deal each slot type's copies, in item order, to its players in roster order
+    copies = [[] for _ in range(num_slots)]
+    for item, slot, count in zip(items, item_slots.tolist(), counts.tolist()):
+        copies[slot].extend([item.name] * count)
+    dealt = [0] * num_slots
+
+    pairs = []
+    for e in used.tolist():
+        slot, amount = int(cols[e]), int(flow[e])
+        for name in copies[slot][dealt[slot]:dealt[slot] + amount]:
+            pairs.append((int(rows[e]), name))
+        dealt[slot] += amount
+
+    pairs.sort(key=lambda pair: pair[0])
+    return [(names[r], name) for r, name in pairs]
@@ -1,4 +1,26 @@
+import sys
+
+# Every slot type an item (or a player's need) can have
+SLOT_TYPES = tuple(sys.intern(slot) for slot in ("accessory", "body", "feet", "hands", "head", "legs", "weapon"))
+
+_SLOT_LOOKUP = {slot: slot for slot in SLOT_TYPES}
+
+def parse_slot_type(value):
+    """
+    Coerce a string into one of SLOT_TYPES, ignoring case and surrounding spaces.
+
+    Always returns the interned string from SLOT_TYPES, so slot types can be
+    compared and hashed cheaply. Raises ValueError for anything else, rather
+    than letting an unknown slot silently score 0.
+    """
+    slot = _SLOT_LOOKUP.get(value)
+    if slot is None:
+        slot = _SLOT_LOOKUP.get(value.strip().lower()) if isinstance(value, str) else None
+        if slot is None:
+            raise ValueError(f"Unknown slot type: {value!r}")
+    return slot
+
 class Item:
     def __init__(self, name, slot_type):
         self.name = name
-        self.slot_type = slot_type
+        self.slot_type = parse_slot_type(slot_type)
\ No newline at end of file
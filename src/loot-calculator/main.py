@@ -1,7 +1,16 @@
+import numpy as np
 from scipy.optimize import linear_sum_assignment
-from player import Player, Job
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+from player import Player
 from item import Item
 from constants import *
+from roster import Roster
+from tables import get_tables
+from profiling import count, profiling, set_value, stage
+
+# Above this share of real contender cells, the dense solver is faster than the sparse one
+SPARSE_MAX_DENSITY = 0.25
 
 def calculate_weight(player: Player, item: Item, num_contenders: int):
     """
@@ -27,32 +36,25 @@ def calculate_weight(player: Player, item: Item, num_contenders: int):
     Returns:
         int: The computed weight for this player/item pair.
     """
-    weight = 0
-
-    # Spec priority
-    if not player.is_main_spec:
-        weight += OFF_SPEC_PENALTY
+    tables = get_tables()
 
-    # Job priority
-    weight += JOB_PRIORITY.get(player.job, 0)
+    # Spec, job and slot priority (precompiled per job/slot/spec)
+    weight = tables.base_rows[player.job.ordinal][tables.slot_index(item.slot_type)][bool(player.is_main_spec)]
 
     # Recent loot
-    weight += player.bosses_without_loot * RECENT_LOOT_PENALTY_MULT
-
-    # Slot priority
-    weight += SLOT_WEIGHTS.get(item.slot_type, 0)
+    weight += player.bosses_without_loot * tables.recent_loot_penalty_mult
 
     # Need intensity
-    weight += player.items_needed * ITEMS_NEEDED_MULT
+    weight += player.items_needed * tables.items_needed_mult
 
     # If this is the final needed item in a slot-type
     if item.slot_type in player.slot_types_needed and len(player.slot_types_needed) == 1:
-        weight += FINAL_ITEM
+        weight += tables.final_item
 
     # Contest penalty
     # (num_contenders includes them)
     if num_contenders > 1:
-        weight += (num_contenders - 1) * 25
+        weight += (num_contenders - 1) * tables.contest_penalty
 
     return weight
 
@@ -65,215 +67,280 @@ def build_weight_matrix(players, items):
     Each cell is the weight for giving that item to that player.
 
     If a player does NOT need a given item slot, the weight is set to a very
-    large number to effectively mark it as "unassignable."
+    large number to effectively mark it as "unassignable": UNASSIGNABLE, or
+    more when real weights get close to it, so it's always above any real total.
+
+    This computes the same values as calling calculate_weight() for every cell,
+    but does it with array operations: contenders are counted once per slot type
+    instead of once per cell, and every term is applied to the whole matrix.
 
     Args:
-        players (list[Player]): All players eligible for loot this week.
+        players (list[Player] | Roster): All players eligible for loot this week.
         items (list[Item]): The loot drops available this week.
 
     Returns:
-        list[list[int]]: 2D matrix of assignment weights.
+        numpy.ndarray: 2D int64 matrix of assignment weights (players x items).
     """
-    matrix = []
-    
-    for player in players:
-        row = []
-        for item in items:
-            # Determine how many people want this item
-            contenders = sum(1 for p in players if item.slot_type in p.slot_types_needed)
-
-            # If player doesn't need it at all, penalize hard
-            if item.slot_type not in player.slot_types_needed:
-                row.append(999999)  # Basically "don't pick me"
-            else:
-                row.append(calculate_weight(player, item, contenders))
-        
-        matrix.append(row)
-    
-    return matrix
-
-def assign_loot(players, items):
+    slot_types, item_slots = _slot_columns(items)
+    return _weights_from_arrays(**_player_arrays(players, slot_types), item_slots=item_slots)
+
+def build_sparse_weight_matrix(players, items):
     """
-    Assign each item to the most optimal player using the Hungarian algorithm.
+    Construct the player -> item weights as a sparse matrix.
 
-    This solves the global assignment problem:
-    It finds the combination of assignments that results in the lowest total weight,
-    meaning the most fair/optimal loot distribution for the raid.
+    Same values as build_weight_matrix(), but only cells where the player
+    needs the item's slot are stored. There is no "unassignable" sentinel:
+    a missing cell means the player can't get that item.
 
     Args:
-        players (list[Player]): Players being considered for loot.
-        items (list[Item]): Items being distributed.
+        players (list[Player] | Roster): All players eligible for loot this week.
+        items (list[Item]): The loot drops available this week.
 
     Returns:
-        list[tuple[str, str]]: (player_name, item_name) assignment pairs.
+        scipy.sparse.csr_matrix: Players x items weights for real contenders only.
+    """
+    slot_types, item_slots = _slot_columns(items)
+    return _sparse_weights_from_arrays(**_player_arrays(players, slot_types), item_slots=item_slots)
+
+def _slot_columns(items):
+    """Give each distinct slot type among the drops a column index."""
+    slot_index = {}
+    item_slots = np.array(
+        [slot_index.setdefault(item.slot_type, len(slot_index)) for item in items],
+        dtype=np.intp,
+    )
+    return list(slot_index), item_slots
+
+def _player_arrays(players, slot_types):
+    """Collect the per-player and per-slot inputs of the weight calculation as arrays."""
+    if isinstance(players, Roster):
+        return players.weight_arrays(slot_types)
+
+    # needs[p, s] is True if player p needs slot type s
+    needs = np.array(
+        [[slot in player.slot_types_needed for slot in slot_types] for player in players],
+        dtype=bool,
+    ).reshape(len(players), len(slot_types))
+    num_slots_needed = np.array([len(player.slot_types_needed) for player in players], dtype=np.int64)
+    jobs = np.array([player.job.ordinal for player in players], dtype=np.intp)
+    tables = get_tables()
+
+    return {
+        "job_weights": tables.job_weights[jobs],
+        "is_main_spec": np.array([bool(player.is_main_spec) for player in players], dtype=bool),
+        "bosses_without_loot": np.array([player.bosses_without_loot for player in players], dtype=np.int64),
+        "items_needed": np.array([player.items_needed for player in players], dtype=np.int64),
+        "needs": needs,
+        "is_final": num_slots_needed == 1,
+        "slot_weights": tables.slot_weights_for(slot_types),
+    }
+
+def _player_terms(job_weights, is_main_spec, bosses_without_loot, items_needed):
+    """Weight terms that only depend on the player."""
+    tables = get_tables()
+    return (
+        np.where(is_main_spec, 0, tables.off_spec_penalty)
+        + job_weights
+        + bosses_without_loot * tables.recent_loot_penalty_mult
+        + items_needed * tables.items_needed_mult
+    )
+
+def _slot_terms(needs, slot_weights):
+    """Weight terms that only depend on the slot (contenders includes the player)."""
+    contenders = needs.sum(axis=0)
+    return slot_weights + np.maximum(contenders - 1, 0) * get_tables().contest_penalty
+
+def _weights_from_arrays(job_weights, is_main_spec, bosses_without_loot, items_needed,
+                         needs, is_final, slot_weights, item_slots):
     """
-    matrix = build_weight_matrix(players, items)
-    row_ind, col_ind = linear_sum_assignment(matrix)
+    Vectorized core of build_weight_matrix().
 
-    results = []
-    for r, c in zip(row_ind, col_ind):
-        results.append((players[r].name, items[c].name))
-    return results
+    Per-player arrays have length P, per-slot arrays have length S, and
+    item_slots maps each of the I items to its slot column. The result is
+    the P x I weight matrix, mirroring calculate_weight() term by term.
+    """
+    player_terms = _player_terms(job_weights, is_main_spec, bosses_without_loot, items_needed)
+    slot_terms = _slot_terms(needs, slot_weights)
 
+    per_slot = player_terms[:, None] + slot_terms[None, :]
+    per_slot += np.where(needs & is_final[:, None], get_tables().final_item, 0)
+    per_slot = np.where(needs, per_slot, _unassignable_for(per_slot[needs], min(len(per_slot), len(item_slots))))
 
-# Test Data
-# Test Set 1: Small group with simple needs
-test_set_1 = {
-    "players": [
-        Player("Alice", Job.WHM, True, 2, 3, {"weapon", "head"}),
-        Player("Bob", Job.DRG, True, 1, 2, {"weapon"}),
-        Player("Charlie", Job.BRD, False, 3, 4, {"head", "body"}),
-    ],
-    "items": [
-        Item("Weapon Coffer", "weapon"),
-        Item("Head Coffer", "head"),
-    ]
-}
-
-# Test Set 2: Medium group with competing needs
-test_set_2 = {
-    "players": [
-        Player("Diana", Job.SGE, True, 5, 6, {"accessory", "legs", "feet"}),
-        Player("Eve", Job.RDM, True, 0, 1, {"accessory"}),
-        Player("Frank", Job.SAM, True, 4, 5, {"legs", "hands"}),
-        Player("Grace", Job.DNC, False, 2, 3, {"accessory", "feet"}),
-        Player("Henry", Job.PLD, True, 3, 4, {"legs"}),
-    ],
-    "items": [
-        Item("Accessory Coffer", "accessory"),
-        Item("Legs Coffer", "legs"),
-        Item("Feet Coffer", "feet"),
-    ]
-}
-
-# Test Set 3: Large group with diverse needs
-test_set_3 = {
-    "players": [
-        Player("Ivan", "warrior", True, 7, 8, {"weapon", "body", "head"}),
-        Player("Jane", "summoner", True, 1, 2, {"weapon"}),
-        Player("Kyle", Job.MNK, False, 6, 7, {"body", "hands", "feet"}),
-        Player("Laura", Job.AST, True, 2, 3, {"head", "accessory"}),
-        Player("Mike", Job.GNB, True, 4, 5, {"weapon", "body"}),
-        Player("Nina", Job.MCH, False, 5, 6, {"hands", "feet"}),
-        Player("Oscar", Job.NIN, True, 3, 4, {"head"}),
-        Player("Paula", Job.PCT, True, 0, 1, {"accessory"}),
-    ],
-    "items": [
-        Item("Weapon Coffer", "weapon"),
-        Item("Body Coffer", "body"),
-        Item("Head Coffer", "head"),
-        Item("Accessory Coffer", "accessory"),
-    ]
-}
-
-# Test Set 4: Edge case - everyone needs the same item
-test_set_4 = {
-    "players": [
-        Player("Quinn", Job.DRK, True, 8, 7, {"weapon", "legs"}),
-        Player("Rachel", Job.SAM, True, 6, 5, {"weapon", "body"}),
-        Player("Steve", Job.BLM, False, 4, 6, {"weapon", "hands"}),
-        Player("Tina", Job.RPR, True, 2, 3, {"weapon"}),
-    ],
-    "items": [
-        Item("Weapon Coffer", "weapon"),
-        Item("Legs Coffer", "legs"),
-    ]
-}
-
-# Test Set 5: Mixed priorities with multiple items
-test_set_5 = {
-    "players": [
-        Player("Uma", Job.WHM, True, 10, 8, {"hands", "feet", "legs", "body"}),
-        Player("Victor", Job.MCH, False, 1, 2, {"hands"}),
-        Player("Wendy", Job.VPR, True, 5, 6, {"feet", "legs"}),
-        Player("Xavier", Job.GNB, True, 0, 1, {"body"}),
-        Player("Yara", Job.RDM, True, 3, 4, {"hands", "feet"}),
-        Player("Zack", Job.DRG, False, 7, 8, {"legs", "body"}),
-    ],
-    "items": [
-        Item("Hands Coffer", "hands"),
-        Item("Feet Coffer", "feet"),
-        Item("Legs Coffer", "legs"),
-        Item("Body Coffer", "body"),
-    ]
-}
-
-# Test Set 6: No overlapping needs
-test_set_6 = {
-    "players": [
-        Player("Aaron", Job.SAM, True, 4, 5, {"weapon"}),
-        Player("Beth", Job.SCH, True, 3, 4, {"head"}),
-        Player("Carl", Job.BRD, True, 2, 3, {"accessory"}),
-    ],
-    "items": [
-        Item("Weapon Coffer", "weapon"),
-        Item("Head Coffer", "head"),
-        Item("Accessory Coffer", "accessory"),
-    ]
-}
-
-# Test Set 7: All off-spec players
-test_set_7 = {
-    "players": [
-        Player("Derek", Job.DRK, False, 5, 6, {"body", "legs"}),
-        Player("Emma", Job.PCT, False, 4, 5, {"body", "hands"}),
-        Player("Felix", Job.NIN, False, 6, 7, {"legs", "feet"}),
-        Player("Gina", Job.AST, False, 3, 4, {"hands"}),
-    ],
-    "items": [
-        Item("Body Coffer", "body"),
-        Item("Legs Coffer", "legs"),
-        Item("Hands Coffer", "hands"),
-    ]
-}
-
-# Test Set 8: Varied item needs with multiple slot types per player
-test_set_8 = {
-    "players": [
-        Player("Hugo", Job.RPR, True, 9, 8, {"weapon", "head", "body", "accessory"}),
-        Player("Iris", Job.DNC, True, 2, 3, {"head", "feet"}),
-        Player("Jack", Job.PLD, False, 5, 6, {"body", "hands", "legs"}),
-        Player("Kelly", Job.SMN, True, 1, 2, {"accessory"}),
-        Player("Liam", Job.DRG, True, 7, 7, {"weapon", "legs"}),
-        Player("Mona", Job.WHM, False, 4, 5, {"hands", "feet"}),
-    ],
-    "items": [
-        Item("Weapon Coffer", "weapon"),
-        Item("Head Coffer", "head"),
-        Item("Hands Coffer", "hands"),
-        Item("Accessory Coffer", "accessory"),
-    ]
-}
+    # Expand slot columns out to one column per item
+    return per_slot[:, item_slots]
 
-# Function calls for each test set
-print("Test Set 1:")
-print(assign_loot(test_set_1["players"], test_set_1["items"]))
-print()
+def _unassignable_for(real_weights, num_matches):
+    """
+    The weight of a cell nobody should get: UNASSIGNABLE, or more if the real weights come near it.
+
+    It's above any total of real weights over num_matches assignments, so a
+    matching that hands out one more real item is always cheaper. On large
+    rosters the contest penalty alone can pass UNASSIGNABLE, so the fixed
+    constant isn't enough, and whether a cell is real has to come from the
+    needs mask rather than from comparing against it.
+    """
+    if real_weights.size == 0:
+        return UNASSIGNABLE
+    return int(_unassignable_from_range(real_weights.max(), real_weights.min(), num_matches))
+
+def _unassignable_from_range(high, low, num_matches):
+    """_unassignable_for() from the highest and lowest real weight, element-wise over arrays of them."""
+    return np.maximum(UNASSIGNABLE, high + (high - low) * num_matches + 1)
 
-print("Test Set 2:")
-print(assign_loot(test_set_2["players"], test_set_2["items"]))
-print()
+def _sparse_weights_from_arrays(job_weights, is_main_spec, bosses_without_loot, items_needed,
+                                needs, is_final, slot_weights, item_slots):
+    """
+    Vectorized core of build_sparse_weight_matrix().
+
+    Takes the same arrays as _weights_from_arrays(), but only computes the
+    (player, slot) pairs where the player needs the slot, then repeats each
+    slot's pairs for every item of that slot.
+    """
+    num_players, num_items = len(job_weights), len(item_slots)
+    player_terms = _player_terms(job_weights, is_main_spec, bosses_without_loot, items_needed)
+    slot_terms = _slot_terms(needs, slot_weights)
+
+    # Contender pairs grouped by slot: pair_slots is sorted, pair_players ascending within a slot
+    pair_slots, pair_players = np.nonzero(needs.T)
+    pair_weights = (
+        player_terms[pair_players]
+        + slot_terms[pair_slots]
+        + np.where(is_final[pair_players], get_tables().final_item, 0)
+    )
+
+    # Each item takes the whole run of pairs belonging to its slot
+    contenders = needs.sum(axis=0)
+    run_starts = np.concatenate(([0], np.cumsum(contenders)[:-1])).astype(np.intp)
+    lengths = contenders[item_slots]
+    item_cols = np.repeat(np.arange(num_items), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    pair_index = np.repeat(run_starts[item_slots], lengths) + offsets
+
+    return csr_matrix(
+        (pair_weights[pair_index], (pair_players[pair_index], item_cols)),
+        shape=(num_players, num_items),
+    )
+
+def _solve_sparse(weights):
+    """
+    Minimum-weight matching on a sparse players x items weight matrix.
+
+    Every item gets a dummy "nobody" row so a full matching always exists.
+    The dummy costs more than any total of real weights, so real contenders
+    are always preferred, just like the sentinel cells of the dense matrix.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: Row and column indices of the real matches.
+    """
+    num_players, num_items = weights.shape
+    if num_items == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    coo = weights.tocoo()
+    # The matcher treats zero as "no edge", so shift every real weight to at least 1.
+    # Every full matching covers every item once, so this doesn't change the optimum.
+    data = coo.data + (1 - coo.data.min() if coo.nnz else 0)
+    graph = csr_matrix(
+        (
+            np.concatenate((data, np.full(num_items, _unassignable_for(data, num_items)))),
+            (
+                np.concatenate((coo.row, num_players + np.arange(num_items))),
+                np.concatenate((coo.col, np.arange(num_items))),
+            ),
+        ),
+        shape=(num_players + num_items, num_items),
+    )
+    row_ind, col_ind = min_weight_full_bipartite_matching(graph)
+
+    real = row_ind < num_players
+    row_ind, col_ind = row_ind[real], col_ind[real]
+    order = np.argsort(row_ind)
+    return row_ind[order], col_ind[order]
+
+def assign_loot(players, items, backend="auto", profile=False):
+    """
+    Assign each item to the most optimal player using the Hungarian algorithm.
 
-print("Test Set 3:")
-print(assign_loot(test_set_3["players"], test_set_3["items"]))
-print()
+    This solves the global assignment problem:
+    It finds the combination of assignments that results in the lowest total weight,
+    meaning the most fair/optimal loot distribution for the raid.
 
-print("Test Set 4:")
-print(assign_loot(test_set_4["players"], test_set_4["items"]))
-print()
+    The solver is picked with backend:
+    - "dense": Hungarian algorithm on the full players x items matrix.
+    - "sparse": Minimum-weight bipartite matching on only the cells where
+      a player needs the item's slot. Memory and time scale with the number
+      of real contenders instead of players x items.
+    - "auto" (default): "sparse" when the share of real contender cells is
+      at most SPARSE_MAX_DENSITY, otherwise "dense".
 
-print("Test Set 5:")
-print(assign_loot(test_set_5["players"], test_set_5["items"]))
-print()
+    Args:
+        players (list[Player] | Roster): Players being considered for loot.
+        items (list[Item]): Items being distributed.
+        backend (str): "auto", "dense" or "sparse".
+        profile (bool): If True, also return a profiling.Profile with the
+            time spent in each stage, the cells evaluated and the matrix size.
+            The same data is collected for any call made inside a
+            profiling.profiling() block; inside one, the block's own Profile
+            is added to and returned.
 
-print("Test Set 6:")
-print(assign_loot(test_set_6["players"], test_set_6["items"]))
-print()
+    Returns:
+        list[tuple[str, str]]: (player_name, item_name) assignment pairs.
+        Items that nobody needs are left out rather than handed to a
+        player who doesn't need them.
+        With profile=True, a (pairs, Profile) tuple instead.
+    """
+    if backend not in ("auto", "dense", "sparse"):
+        raise ValueError(f"Unknown backend: {backend!r}")
+    if profile:
+        with profiling(reuse=True) as record:
+            return assign_loot(players, items, backend), record
+
+    with stage("prepare"):
+        slot_types, item_slots = _slot_columns(items)
+        arrays = _player_arrays(players, slot_types)
+
+    with stage("count_contenders"):
+        cells = len(players) * len(items)
+        contender_cells = int(arrays["needs"].sum(axis=0)[item_slots].sum())
+
+    if backend == "auto":
+        backend = "sparse" if cells and contender_cells <= SPARSE_MAX_DENSITY * cells else "dense"
+
+    set_value("backend", backend)
+    set_value("players", len(players))
+    set_value("items", len(items))
+
+    if backend == "sparse":
+        with stage("build_matrix"):
+            weights = _sparse_weights_from_arrays(**arrays, item_slots=item_slots)
+        with stage("solve"):
+            row_ind, col_ind = _solve_sparse(weights)
+        count("cells_evaluated", contender_cells)
+    else:
+        with stage("build_matrix"):
+            matrix = _weights_from_arrays(**arrays, item_slots=item_slots)
+        with stage("solve"):
+            row_ind, col_ind = linear_sum_assignment(matrix)
+            # Drop matches that only exist because the solver had to fill the slot
+            real = arrays["needs"][row_ind, item_slots[col_ind]]
+            row_ind, col_ind = row_ind[real], col_ind[real]
+        count("cells_evaluated", cells)
+        count("sentinel_cells", cells - contender_cells)
+
+    with stage("map_names"):
+        names = players.names if isinstance(players, Roster) else [player.name for player in players]
+
+        results = []
+        for r, c in zip(row_ind, col_ind):
+            results.append((names[r], items[c].name))
+    count("assignments", len(results))
+    return results
 
-print("Test Set 7:")
-print(assign_loot(test_set_7["players"], test_set_7["items"]))
-print()
+# Function calls for each test set
+if __name__ == "__main__":
+    from fixtures import TEST_SETS
 
-print("Test Set 8:")
-print(assign_loot(test_set_8["players"], test_set_8["items"]))
-print()
\ No newline at end of file
+    for number, test_set in enumerate(TEST_SETS, start=1):
+        print(f"Test Set {number}:")
+        print(assign_loot(test_set["players"], test_set["items"]))
+        print()
\ No newline at end of file
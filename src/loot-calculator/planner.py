@@ -0,0 +1,240 @@
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import csr_matrix
+from batch import parallel_map
+from main import _player_arrays, _slot_columns, _unassignable_for
+from tables import get_tables
+
+def _slot_schedule(schedule):
+    """Slot types across the whole schedule, and how many of each drop in each period."""
+    slot_types, _ = _slot_columns([item for period in schedule for item in period])
+    slot_index = {slot: i for i, slot in enumerate(slot_types)}
+    supply = np.zeros((len(schedule), len(slot_types)), dtype=np.int64)
+    for t, period in enumerate(schedule):
+        for item in period:
+            supply[t, slot_index[item.slot_type]] += 1
+    return slot_types, slot_index, supply
+
+def _droughts(p_idx, t_idx, bosses_without_loot):
+    """bosses_without_loot at each award, in period order, as simulator.simulate_seasons() would have it."""
+    last = {}
+    droughts = []
+    for p, t in zip(p_idx.tolist(), t_idx.tolist()):
+        droughts.append(bosses_without_loot[p] + t if p not in last else t - last[p] - 1)
+        last[p] = t
+    return droughts
+
+def plan_loot(players, schedule):
+    """
+    Plan loot over several periods at once instead of one period at a time.
+
+    The schedule lists the drops expected in each period, where a period is
+    one assign_loot() call's worth of drops (e.g. one boss). The plan is a
+    time-expanded flow: a variable for every (player, needed slot type,
+    period), with each player getting at most one item per period and each
+    needed slot type at most once, and each period handing out no more of a
+    slot type than drops. Costs are the usual weights, offset by more than
+    any plan's total so that every drop somebody can use is handed out.
+
+    Because it sees the whole schedule, the plan can, for example, give a
+    weapon to a player who then finishes their set next period instead of
+    the one who ranks first this period. The FINAL_ITEM bonus goes to each
+    player the plan completes, once. That completion is a yes/no variable
+    per player, so the plan is solved as a small mixed-integer program with
+    HiGHS rather than a pure flow.
+
+    bosses_without_loot follows each player through the plan: it grows by
+    one every period and drops back to 0 after the player gets something,
+    like simulator.simulate_seasons() does. Each player is a chain through
+    the periods, one unit of flow that enters with their starting drought,
+    and at each period either waits (one more boss without loot) or takes
+    an item, after which it may carry on from a drought of 0. Every period
+    adds the same to everyone's drought, which changes nothing between the
+    players of one period, so an award in period t is charged for its
+    drought minus t; otherwise holding a drop back for a later period would
+    always look better. items_needed and the contender counts stay at
+    their starting values.
+    Equal plans are broken towards earlier periods, then towards players
+    earlier in the roster.
+
+    Args:
+        players (list[Player]): The roster at the start of the schedule.
+        schedule (list[list[Item]]): Expected drops for each period, in order.
+
+    Returns:
+        dict: With keys:
+            - "periods": for each period, its (player_name, item_name) pairs
+            - "finished": names of players whose needs the plan completes
+            - "total_weight": projected weight of the plan, FINAL_ITEM included
+    """
+    names = [player.name for player in players]
+    num_players, num_periods = len(players), len(schedule)
+    slot_types, slot_index, supply = _slot_schedule(schedule)
+    arrays = _player_arrays(players, slot_types)
+    tables = get_tables()
+    needs = arrays["needs"]
+
+    # One variable per (player, slot type, period) where the player needs that slot and it drops
+    p_idx, s_idx = np.nonzero(needs)
+    t_idx = np.repeat(np.arange(num_periods), len(p_idx))
+    p_idx, s_idx = np.tile(p_idx, num_periods), np.tile(s_idx, num_periods)
+    drops = supply[t_idx, s_idx] > 0
+    p_idx, s_idx, t_idx = p_idx[drops], s_idx[drops], t_idx[drops]
+    num_x = len(p_idx)
+    if not num_x:
+        return {"periods": [[] for _ in schedule], "finished": [], "total_weight": 0}
+
+    contest = np.maximum(needs.sum(axis=0) - 1, 0) * tables.contest_penalty
+    costs = (
+        np.where(arrays["is_main_spec"], 0, tables.off_spec_penalty)[p_idx]
+        + arrays["job_weights"][p_idx]
+        + arrays["items_needed"][p_idx] * tables.items_needed_mult
+        + arrays["slot_weights"][s_idx]
+        + contest[s_idx]
+    )
+
+    # Each player's chain: a start, then between consecutive periods a wait and a carry-on after an award
+    chained, q_idx = np.unique(p_idx, return_inverse=True)
+    num_q, num_steps = len(chained), num_periods - 1
+    num_c = num_q * (1 + 2 * num_steps)
+    start = num_x + np.arange(num_q)
+    wait = num_x + num_q + np.arange(num_q * num_steps).reshape(num_q, num_steps)
+    carry_on = wait + num_q * num_steps
+    mult = tables.recent_loot_penalty_mult
+    # Starting from period 0 with the player's drought, which each wait adds one to,
+    # and each award in period t takes t back off, so it only counts the waits since the last one
+    chain_costs = np.concatenate((
+        arrays["bosses_without_loot"][chained] * mult,
+        np.full(num_q * num_steps, mult),
+        np.zeros(num_q * num_steps),
+    ))
+    award_costs = costs - t_idx * mult
+
+    # Players who could get every slot type they need within the schedule
+    can_finish = np.array(
+        [p for p, player in enumerate(players)
+         if player.slot_types_needed and all(slot in slot_index for slot in player.slot_types_needed)],
+        dtype=np.intp,
+    )
+    num_y = len(can_finish)
+    y_col = {p: num_x + num_c + i for i, p in enumerate(can_finish.tolist())}
+
+    # What a chain charges an award: its start, or -(t + 1) for the award it carries on from
+    chain_terms = np.concatenate((chain_costs[:num_q], -(np.arange(num_steps) + 1) * mult))
+    per_award = np.array([
+        award_costs.min() + chain_terms.min() + min(tables.final_item, 0),
+        award_costs.max() + chain_terms.max() + max(tables.final_item, 0),
+    ])
+    offset = _unassignable_for(per_award, int(supply.sum()))
+    # Less than one in total over any plan, so it only decides between equal weights
+    tie_break = (t_idx * num_players + p_idx) / (num_players * num_periods * (supply.sum() + 1))
+    objective = np.concatenate((
+        award_costs - float(offset) + tie_break,
+        chain_costs.astype(float),
+        np.full(num_y, float(tables.final_item)),
+    ))
+
+    x = np.arange(num_x)
+    num_slots = len(slot_types)
+    rows, cols, values, lower, upper = [], [], [], [], []
+
+    def add(group, keys, limits):
+        """One row per distinct key, summing the x variables in it."""
+        base = len(upper)
+        rows.append(base + group)
+        cols.append(x)
+        values.append(np.ones(num_x))
+        lower.extend([-np.inf] * len(keys))
+        upper.extend(limits[keys])
+
+    # Each needed slot type at most once per player
+    keys, group = np.unique(p_idx * num_slots + s_idx, return_inverse=True)
+    add(group, keys, np.ones(num_players * num_slots))
+    # At most one item per player per period
+    keys, group = np.unique(p_idx * num_periods + t_idx, return_inverse=True)
+    add(group, keys, np.ones(num_players * num_periods))
+    # No more of a slot type than drops in that period
+    keys, group = np.unique(t_idx * num_slots + s_idx, return_inverse=True)
+    add(group, keys, supply.ravel())
+
+    # A chain's flow into each period (its start, a wait or a carry-on) leaves by a wait or an award ...
+    into = len(upper) + np.arange(num_q * num_periods).reshape(num_q, num_periods)
+    rows.extend((into[:, 0], into[:, 1:].ravel(), into[:, 1:].ravel(), into[:, :-1].ravel(), into[q_idx, t_idx]))
+    cols.extend((start, wait.ravel(), carry_on.ravel(), wait.ravel(), x))
+    values.extend((np.ones(num_q), np.ones(wait.size), np.ones(wait.size), -np.ones(wait.size), -np.ones(num_x)))
+    lower.extend([0] * into.size)
+    upper.extend([0] * into.size)
+    # ... and only carries on after an award
+    after = len(upper) + np.arange(num_q * num_steps).reshape(num_q, num_steps)
+    early = t_idx < num_steps
+    rows.extend((after.ravel(), after[q_idx[early], t_idx[early]]))
+    cols.extend((carry_on.ravel(), x[early]))
+    values.extend((np.ones(carry_on.size), -np.ones(early.sum())))
+    lower.extend([-np.inf] * after.size)
+    upper.extend([0] * after.size)
+
+    # Finishing needs every needed slot type: y[p] <= sum over periods of x[p, s, t]
+    finish_p, finish_s = np.nonzero(needs[can_finish])
+    finish_p = can_finish[finish_p]
+    finish_rows = {(p, s): len(upper) + i for i, (p, s) in enumerate(zip(finish_p.tolist(), finish_s.tolist()))}
+    lower.extend([-np.inf] * len(finish_rows))
+    upper.extend([0] * len(finish_rows))
+    has_y = np.isin(p_idx, can_finish)
+    rows.append(np.array([finish_rows[p, s] for p, s in zip(p_idx[has_y].tolist(), s_idx[has_y].tolist())],
+                         dtype=np.intp))
+    cols.append(x[has_y])
+    values.append(-np.ones(has_y.sum()))
+    rows.append(np.array(list(finish_rows.values()), dtype=np.intp))
+    cols.append(np.array([y_col[p] for p in finish_p.tolist()], dtype=np.intp))
+    values.append(np.ones(len(finish_rows)))
+
+    constraints = csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(upper), num_x + num_c + num_y),
+    )
+    result = milp(
+        objective,
+        constraints=LinearConstraint(constraints, np.array(lower, dtype=float), np.array(upper, dtype=float)),
+        integrality=np.ones(num_x + num_c + num_y),
+        bounds=Bounds(0, 1),
+        options={"mip_rel_gap": 0},
+    )
+    if not result.success:
+        raise RuntimeError(f"Loot plan could not be solved: {result.message}")
+
+    chosen = np.flatnonzero(np.rint(result.x[:num_x]))
+    chosen = chosen[np.lexsort((p_idx[chosen], s_idx[chosen], t_idx[chosen]))]
+    finished = [names[p] for p in can_finish[np.rint(result.x[num_x + num_c:]).astype(bool)].tolist()]
+
+    # Deal each period's copies of a slot type, in item order, to its players in roster order
+    periods = []
+    for t, period in enumerate(schedule):
+        copies = {}
+        for item in period:
+            copies.setdefault(slot_index[item.slot_type], []).append(item.name)
+        picks = chosen[t_idx[chosen] == t]
+        pairs = sorted(
+            (int(p_idx[e]), copies[int(s_idx[e])].pop(0)) for e in picks.tolist()
+        )
+        periods.append([(names[p], item_name) for p, item_name in pairs])
+
+    total_weight = (
+        int(costs[chosen].sum())
+        + sum(_droughts(p_idx[chosen], t_idx[chosen], arrays["bosses_without_loot"])) * mult
+        + tables.final_item * len(finished)
+    )
+    return {"periods": periods, "finished": finished, "total_weight": total_weight}
+
+def _plan_problem(problem):
+    players, schedule = problem
+    return plan_loot(players, schedule)
+
+def plan_loot_batch(problems, max_workers=None, chunksize=None):
+    """
+    plan_loot() for many independent (players, schedule) problems, e.g.
+    every static in a league, spread across a process pool.
+
+    Returns:
+        list[dict]: plan_loot()'s result for each problem, in input order.
+    """
+    return parallel_map(_plan_problem, problems, max_workers=max_workers, chunksize=chunksize)
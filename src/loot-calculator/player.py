@@ -1,4 +1,5 @@
 from enum import Enum
+from item import parse_slot_type
 
 class Job(Enum):
     PLD = ("pld", "Paladin", "Tank")
@@ -37,15 +38,30 @@ class Job(Enum):
         """Coerce a string into a Job enum, matching short code or full name."""
         if isinstance(value, Job):
             return value  # already the correct type
+        if not isinstance(value, str):
+            raise ValueError(f"Job must be a Job or a string, not {type(value).__name__}: {value!r}")
 
-        value = value.strip().lower()
+        job = _JOB_ALIASES.get(value)
+        if job is None:
+            job = _JOB_ALIASES.get(value.strip().lower())
+            if job is None:
+                raise ValueError(f"Unknown job value: {value!r}")
+        return job
 
-        for job in cls:
-            if value == job.short.lower() or value == job.full.lower():
-                return job
+# Every job in a fixed order. job.ordinal is the job's position in it,
+# e.g. for indexing arrays and lookup tables.
+JOBS = tuple(Job)
+for _ordinal, _job in enumerate(JOBS):
+    _job.ordinal = _ordinal
+
+# Short code and full name of every job, lowercased, plus the exact
+# spellings in the enum so that already-clean input skips normalizing
+_JOB_ALIASES = {}
+for _job in JOBS:
+    for _alias in (_job.short, _job.full, _job.name):
+        _JOB_ALIASES[_alias] = _job
+        _JOB_ALIASES[_alias.lower()] = _job
 
-        raise ValueError(f"Unknown job value: {value!r}")
-    
 class Player:
     def __init__(self, name, job, is_main_spec, bosses_without_loot, items_needed, slot_types_needed):
         self.name = name
@@ -53,4 +69,4 @@ class Player:
         self.is_main_spec = is_main_spec
         self.bosses_without_loot = bosses_without_loot
         self.items_needed = items_needed  # total number of pieces needed
-        self.slot_types_needed = slot_types_needed  # e.g. {"weapon", "ring", "head"}
\ No newline at end of file
+        self.slot_types_needed = {parse_slot_type(slot) for slot in slot_types_needed}  # e.g. {"weapon", "accessory", "head"}
\ No newline at end of file
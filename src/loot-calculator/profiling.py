@@ -0,0 +1,101 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+class Profile:
+    """
+    Stage timings, counters and values collected while profiling is active.
+
+    - stages: total seconds and number of calls per named stage
+    - counters: running totals, e.g. cells evaluated
+    - values: the last value recorded under a name, e.g. matrix dimensions
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.values = {}
+
+    def add_time(self, name, seconds):
+        total, calls = self.stages.get(name, (0.0, 0))
+        self.stages[name] = (total + seconds, calls + 1)
+
+    def as_dict(self):
+        """The whole profile as plain dicts, e.g. for logging as JSON."""
+        return {
+            "stages": {name: {"seconds": total, "calls": calls} for name, (total, calls) in self.stages.items()},
+            "counters": dict(self.counters),
+            "values": dict(self.values),
+        }
+
+    def __repr__(self):
+        return f"Profile({self.as_dict()!r})"
+
+_active = ContextVar("loot_calculator_profile", default=None)
+
+@contextmanager
+def profiling(reuse=False):
+    """
+    Collect a Profile for everything run inside the block.
+
+        with profiling() as profile:
+            assign_loot(players, items)
+        print(profile.as_dict())
+
+    With reuse=True, a block inside another one adds to the outer block's
+    Profile instead of hiding it behind a new one.
+    """
+    profile = _active.get() if reuse else None
+    if profile is not None:
+        yield profile
+        return
+
+    profile = Profile()
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+
+class _Stage:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profile.add_time(self.name, time.perf_counter() - self.start)
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+def stage(name):
+    """Context manager that times a named stage; does nothing unless profiling is active."""
+    profile = _active.get()
+    if profile is None:
+        return _NULL_STAGE
+    return _Stage(profile, name)
+
+def count(name, amount=1):
+    """Add to a named counter if profiling is active."""
+    profile = _active.get()
+    if profile is not None:
+        profile.counters[name] = profile.counters.get(name, 0) + amount
+
+def set_value(name, value):
+    """Store a named value if profiling is active."""
+    profile = _active.get()
+    if profile is not None:
+        profile.values[name] = value
@@ -0,0 +1,76 @@
+import numpy as np
+from main import _player_arrays, _slot_columns
+from roster import Roster
+from tables import get_tables
+
+# Names of the weight terms in a breakdown, in calculate_weight() order
+TERMS = ("spec", "job", "recent_loot", "slot", "need", "final_item", "contest")
+
+def rank_contenders(players, items, k=5):
+    """
+    The k best contenders for each item, with the weight broken down per term.
+
+    Uses the same weights as assign_loot(), so a lower weight ranks higher,
+    but ranks each item on its own instead of solving the whole raid: the
+    top contender for two items can be the same player. Every term is
+    computed once for all players and slot types, and only the top k of
+    each slot type are sorted, so this stays cheap for large rosters.
+
+    Args:
+        players (list[Player] | Roster): Players being considered for loot.
+        items (list[Item]): Items being distributed.
+        k (int): How many contenders to return per item.
+
+    Returns:
+        list[list[dict]]: For each item, in input order, its best contenders
+        (best first). Each entry has "player", "weight" (the same value as
+        calculate_weight()) and "terms", a dict of each term in TERMS.
+        Items that nobody needs get an empty list.
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+
+    slot_types, item_slots = _slot_columns(items)
+    arrays = _player_arrays(players, slot_types)
+    tables = get_tables()
+    names = players.names if isinstance(players, Roster) else [player.name for player in players]
+
+    needs = arrays["needs"]
+    spec = np.where(arrays["is_main_spec"], 0, tables.off_spec_penalty)
+    job = arrays["job_weights"]
+    recent_loot = arrays["bosses_without_loot"] * tables.recent_loot_penalty_mult
+    need = arrays["items_needed"] * tables.items_needed_mult
+    final_item = np.where(arrays["is_final"], tables.final_item, 0)
+    player_total = spec + job + recent_loot + need + final_item
+
+    slot = arrays["slot_weights"]
+    contest = np.maximum(needs.sum(axis=0) - 1, 0) * tables.contest_penalty
+
+    rankings = []
+    for s in range(len(slot_types)):
+        candidates = np.flatnonzero(needs[:, s])
+        totals = player_total[candidates]
+        if len(candidates) > k:
+            # Keep everything tied with the k-th best so ties resolve the same way every time
+            top = totals <= np.partition(totals, k - 1)[k - 1]
+            candidates, totals = candidates[top], totals[top]
+        # Best weight first, then roster order
+        order = np.lexsort((candidates, totals))[:k]
+        rankings.append([
+            {
+                "player": names[p],
+                "weight": int(player_total[p] + slot[s] + contest[s]),
+                "terms": {
+                    "spec": int(spec[p]),
+                    "job": int(job[p]),
+                    "recent_loot": int(recent_loot[p]),
+                    "slot": int(slot[s]),
+                    "need": int(need[p]),
+                    "final_item": int(final_item[p]),
+                    "contest": int(contest[s]),
+                },
+            }
+            for p in candidates[order].tolist()
+        ])
+
+    return [list(rankings[s]) for s in item_slots.tolist()]
@@ -0,0 +1,106 @@
+import numpy as np
+from item import SLOT_TYPES
+from player import Player, JOBS
+from tables import get_tables
+
+# Bit of each slot type in a Roster's slot masks
+SLOT_BITS = {slot: bit for bit, slot in enumerate(SLOT_TYPES)}
+
+class Roster:
+    """
+    A compact, struct-of-arrays list of players.
+
+    Each field is one typed array with an entry per player, and the slot
+    types a player needs are a bitmask over SLOT_TYPES instead of a set of
+    strings. Only the names stay Python strings.
+
+    build_weight_matrix() and assign_loot() accept a Roster anywhere they
+    take a list of Players.
+    """
+
+    def __init__(self, names, jobs, is_main_spec, bosses_without_loot, items_needed, slot_masks):
+        self.names = list(names)
+        self.jobs = np.asarray(jobs, dtype=np.int8)  # index into JOBS
+        self.is_main_spec = np.asarray(is_main_spec, dtype=bool)
+        self.bosses_without_loot = np.asarray(bosses_without_loot, dtype=np.int32)
+        self.items_needed = np.asarray(items_needed, dtype=np.int32)
+        self.slot_masks = np.asarray(slot_masks, dtype=np.uint8)  # bit i set = needs SLOT_TYPES[i]
+
+    @classmethod
+    def from_players(cls, players):
+        """Pack a list of Players into a Roster."""
+        return cls(
+            names=[player.name for player in players],
+            jobs=[player.job.ordinal for player in players],
+            is_main_spec=[bool(player.is_main_spec) for player in players],
+            bosses_without_loot=[player.bosses_without_loot for player in players],
+            items_needed=[player.items_needed for player in players],
+            slot_masks=[slot_mask(player.slot_types_needed) for player in players],
+        )
+
+    def to_players(self):
+        """Unpack the Roster back into a list of Players."""
+        return [
+            Player(
+                name,
+                JOBS[job],
+                bool(is_main_spec),
+                int(bosses_without_loot),
+                int(items_needed),
+                slot_types(mask),
+            )
+            for name, job, is_main_spec, bosses_without_loot, items_needed, mask in zip(
+                self.names,
+                self.jobs,
+                self.is_main_spec,
+                self.bosses_without_loot,
+                self.items_needed,
+                self.slot_masks,
+            )
+        ]
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        """Bytes used by the typed arrays (not counting the name strings)."""
+        return (self.jobs.nbytes + self.is_main_spec.nbytes + self.bosses_without_loot.nbytes
+                + self.items_needed.nbytes + self.slot_masks.nbytes)
+
+    def weight_arrays(self, slot_types):
+        """
+        The per-player and per-slot arrays the weight calculation needs.
+
+        Same keys and values as main._player_arrays() gives for the
+        equivalent list of Players.
+        """
+        tables = get_tables()
+
+        needs = np.zeros((len(self), len(slot_types)), dtype=bool)
+        for s, slot in enumerate(slot_types):
+            if slot in SLOT_BITS:
+                needs[:, s] = (self.slot_masks >> SLOT_BITS[slot]) & 1
+
+        return {
+            "job_weights": tables.job_weights[self.jobs],
+            "is_main_spec": self.is_main_spec,
+            "bosses_without_loot": self.bosses_without_loot.astype(np.int64),
+            "items_needed": self.items_needed.astype(np.int64),
+            "needs": needs,
+            "is_final": np.bitwise_count(self.slot_masks) == 1,
+            "slot_weights": tables.slot_weights_for(slot_types),
+        }
+
+def slot_mask(slots):
+    """Bitmask for a collection of slot type names."""
+    mask = 0
+    for slot in slots:
+        if slot not in SLOT_BITS:
+            raise ValueError(f"Unknown slot type: {slot!r}")
+        mask |= 1 << SLOT_BITS[slot]
+    return mask
+
+def slot_types(mask):
+    """Set of slot type names in a bitmask."""
+    return {slot for slot, bit in SLOT_BITS.items() if mask >> bit & 1}
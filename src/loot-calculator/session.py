@@ -0,0 +1,369 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from item import SLOT_TYPES
+from main import _player_terms, _unassignable_for
+from player import Job
+from tables import get_tables
+
+# Marks a player's column value for a slot they don't need. It's kept apart from
+# the solver's sentinel, which has to grow with the real weights (see main._unassignable_for)
+_NOT_NEEDED = np.iinfo(np.int64).max
+
+class LootSession:
+    """
+    Keeps a loot assignment up to date while its inputs are edited one at a time.
+
+    Instead of a full players x items matrix, the session stores one column
+    per slot type holding each player's weight minus the slot's own terms.
+    Every item of a slot shares that column, and a contender-count change only
+    shifts the slot's terms, so it doesn't touch the column at all.
+
+    For every slot with drops, the session also keeps a pool of candidate
+    rows that always contains the slot's k cheapest rows, where k is at
+    least the number of items. An optimal assignment can always be built
+    from those rows alone: if an item went to a player outside its slot's
+    cheapest k, at least one of those k players would be free and no more
+    expensive. Re-solving only runs the Hungarian algorithm on the pooled
+    rows. Edits that touch no pooled row and no slot with drops keep the
+    previous assignment without solving at all.
+
+    That is how the previous solve is reused; there is no warm start in
+    the Hungarian sense. scipy's linear_sum_assignment can't be seeded with
+    a previous assignment or its dual prices, so every re-solve is a cold
+    solve, kept small by running on the pooled rows only.
+
+    Each pool is filled with the 2k cheapest rows and remembers the weight
+    of the worst one as its threshold; every row outside the pool is at
+    least that expensive. Rows that improve past the threshold join the
+    pool, and the pool is only rebuilt from scratch when fewer than k of
+    its rows remain under the threshold or it grows past 4k rows.
+
+    Results have the same total weight as assign_loot(); ties may be broken
+    differently. If the weights in constants.py change, the next edit (or
+    refresh()) recomputes every column before re-solving.
+    """
+
+    def __init__(self, players, items):
+        self._size = len(players)
+        capacity = max(self._size, 16)
+
+        self._names = [player.name for player in players]
+        self._rows = {name: row for row, name in enumerate(self._names)}
+        self._slot_sets = [set(player.slot_types_needed) for player in players]
+
+        slot_types = dict.fromkeys(SLOT_TYPES)
+        slot_types.update(dict.fromkeys(slot for slots in self._slot_sets for slot in slots))
+        slot_types.update(dict.fromkeys(item.slot_type for item in items))
+        self._slot_types = list(slot_types)
+        self._slot_index = {slot: s for s, slot in enumerate(self._slot_types)}
+
+        self._jobs = np.zeros(capacity, dtype=np.intp)
+        self._is_main_spec = np.zeros(capacity, dtype=bool)
+        self._bosses_without_loot = np.zeros(capacity, dtype=np.int64)
+        self._items_needed = np.zeros(capacity, dtype=np.int64)
+        self._jobs[:self._size] = [Job.from_string(player.job).ordinal for player in players]
+        self._is_main_spec[:self._size] = [bool(player.is_main_spec) for player in players]
+        self._bosses_without_loot[:self._size] = [player.bosses_without_loot for player in players]
+        self._items_needed[:self._size] = [player.items_needed for player in players]
+
+        # base[s, p]: player p's weight for slot s without the slot terms, _NOT_NEEDED if not needed
+        self._base = np.full((len(self._slot_types), capacity), _NOT_NEEDED, dtype=np.int64)
+        self._rebuild_base()
+
+        self._items = list(items)
+        self._k = _candidate_capacity(len(self._items))
+        self._pools = [None] * len(self._slot_types)
+        self._thresholds = [None] * len(self._slot_types)
+        for s in self._active_slots():
+            self._refresh_pool(s)
+
+        self.assignments = []
+        self._solve()
+
+    # ----- Edits -----
+
+    def update_player(self, name, **fields):
+        """
+        Change one player's inputs and re-solve.
+
+        Accepts any of: job, is_main_spec, bosses_without_loot, items_needed,
+        slot_types_needed.
+        """
+        self.refresh()
+        row = self._row(name)
+        contest_changed = False
+        for field, value in fields.items():
+            if field == "job":
+                self._jobs[row] = Job.from_string(value).ordinal
+            elif field == "is_main_spec":
+                self._is_main_spec[row] = bool(value)
+            elif field == "bosses_without_loot":
+                self._bosses_without_loot[row] = value
+            elif field == "items_needed":
+                self._items_needed[row] = value
+            elif field == "slot_types_needed":
+                contest_changed |= self._count_contenders(self._slot_sets[row], -1)
+                self._slot_sets[row] = set(value)
+                contest_changed |= self._count_contenders(self._slot_sets[row], +1)
+            else:
+                raise ValueError(f"Unknown player field: {field!r}")
+
+        self._write_row(row, contest_changed)
+
+    def set_main_spec(self, name, is_main_spec):
+        """Shortcut for update_player(name, is_main_spec=...)."""
+        self.update_player(name, is_main_spec=is_main_spec)
+
+    def add_player(self, player):
+        """Add a player to the roster and re-solve."""
+        self.refresh()
+        if player.name in self._rows:
+            raise ValueError(f"Player already in session: {player.name!r}")
+
+        if self._size == len(self._jobs):
+            self._grow()
+
+        row = self._size
+        self._size += 1
+        self._names.append(player.name)
+        self._rows[player.name] = row
+        self._slot_sets.append(set(player.slot_types_needed))
+        self._jobs[row] = Job.from_string(player.job).ordinal
+        self._is_main_spec[row] = bool(player.is_main_spec)
+        self._bosses_without_loot[row] = player.bosses_without_loot
+        self._items_needed[row] = player.items_needed
+        contest_changed = self._count_contenders(self._slot_sets[row], +1)
+        self._write_row(row, contest_changed)
+
+    def remove_player(self, name):
+        """Remove a player from the roster and re-solve."""
+        self.refresh()
+        row = self._row(name)
+        del self._rows[name]
+        last = self._size - 1
+        touched = self._count_contenders(self._slot_sets[row], -1)
+
+        # Take the row out of the pools before it is overwritten
+        shrunk = []
+        for s, pool in enumerate(self._pools):
+            if pool is None:
+                continue
+            hit = pool == row
+            if hit.any():
+                touched = True
+                shrunk.append(s)
+                self._pools[s] = pool = pool[~hit]
+            pool[pool == last] = row
+
+        # Move the last row into the hole
+        if row != last:
+            for array in (self._jobs, self._is_main_spec, self._bosses_without_loot, self._items_needed):
+                array[row] = array[last]
+            self._base[:, row] = self._base[:, last]
+            self._names[row] = self._names[last]
+            self._slot_sets[row] = self._slot_sets[last]
+            self._rows[self._names[row]] = row
+        self._names.pop()
+        self._slot_sets.pop()
+        self._base[:, last] = _NOT_NEEDED
+        self._size -= 1
+
+        for s in shrunk:
+            if not self._pool_is_valid(s):
+                self._refresh_pool(s)
+        if touched:
+            self._solve()
+
+    def add_item(self, item):
+        """Add a drop and re-solve."""
+        self.refresh()
+        if item.slot_type not in self._slot_index:
+            self._add_slot(item.slot_type)
+
+        self._items.append(item)
+        s = self._slot_index[item.slot_type]
+        if len(self._items) > self._k:
+            self._k = _candidate_capacity(len(self._items))
+            for active in self._active_slots():
+                self._refresh_pool(active)
+        elif self._pools[s] is None:
+            self._refresh_pool(s)
+        self._solve()
+
+    def remove_item(self, name):
+        """Remove the first drop with the given name and re-solve."""
+        self.refresh()
+        index = next((i for i, item in enumerate(self._items) if item.name == name), None)
+        if index is None:
+            raise ValueError(f"Item not in session: {name!r}")
+        item = self._items.pop(index)
+        s = self._slot_index[item.slot_type]
+        if s not in self._active_slots():
+            self._pools[s] = None
+        self._solve()
+
+    def _row(self, name):
+        row = self._rows.get(name)
+        if row is None:
+            raise ValueError(f"Player not in session: {name!r}")
+        return row
+
+    def refresh(self):
+        """Recompute everything if the weights in constants.py changed since the last solve."""
+        if self._version != get_tables().version:
+            self._rebuild_base()
+            for s in self._active_slots():
+                self._refresh_pool(s)
+            self._solve()
+
+    # ----- Internals -----
+
+    def _rebuild_base(self):
+        """Compute every player's column values and the contender counts from scratch."""
+        tables = get_tables()
+        self._version = tables.version
+
+        size = self._size
+        slot_sets = self._slot_sets
+        needs = np.array(
+            [[slot in slots for slot in self._slot_types] for slots in slot_sets],
+            dtype=bool,
+        ).reshape(size, len(self._slot_types))
+        is_final = np.array([len(slots) == 1 for slots in slot_sets], dtype=bool)
+
+        weights = _player_terms(
+            tables.job_weights[self._jobs[:size]],
+            self._is_main_spec[:size],
+            self._bosses_without_loot[:size],
+            self._items_needed[:size],
+        ) + np.where(is_final, tables.final_item, 0)
+        self._base[:, :size] = np.where(needs, weights[:, None], _NOT_NEEDED).T
+        self._contenders = needs.sum(axis=0).astype(np.int64)
+
+    def _row_weights(self, row):
+        """Column values for one player across every slot type."""
+        tables = get_tables()
+        weight = int(_player_terms(
+            tables.job_weights[self._jobs[row]],
+            self._is_main_spec[row],
+            self._bosses_without_loot[row],
+            self._items_needed[row],
+        ))
+        slots = self._slot_sets[row]
+        if len(slots) == 1:
+            weight += tables.final_item
+
+        values = np.full(len(self._slot_types), _NOT_NEEDED, dtype=np.int64)
+        for slot in slots:
+            if slot in self._slot_index:
+                values[self._slot_index[slot]] = weight
+        return values
+
+    def _write_row(self, row, touched=False):
+        """Store a player's new column values, patch the pools, and re-solve if needed."""
+        old = self._base[:, row].copy()
+        new = self._row_weights(row)
+        self._base[:, row] = new
+
+        for s in np.flatnonzero(old != new):
+            pool = self._pools[s]
+            if pool is None:
+                continue
+            threshold = self._thresholds[s]
+            if (pool == row).any():
+                touched = True
+                if old[s] <= threshold < new[s] and not self._pool_is_valid(s):
+                    self._refresh_pool(s)
+            elif new[s] < threshold:
+                touched = True
+                self._pools[s] = np.append(pool, row)
+                if len(self._pools[s]) > 4 * self._k:
+                    self._refresh_pool(s)
+
+        if touched:
+            self._solve()
+
+    def _count_contenders(self, slots, delta):
+        """Adjust contender counts; True if a slot with drops was affected."""
+        active = self._active_slots()
+        touched = False
+        for slot in slots:
+            if slot in self._slot_index:
+                s = self._slot_index[slot]
+                self._contenders[s] += delta
+                touched |= s in active
+        return touched
+
+    def _active_slots(self):
+        return {self._slot_index[item.slot_type] for item in self._items}
+
+    def _refresh_pool(self, s):
+        """Rebuild slot s's pool from its 2k cheapest rows."""
+        size = 2 * self._k
+        if self._size <= size:
+            # Every row is pooled, so there are no outsiders to compare against
+            self._pools[s] = np.arange(self._size)
+            self._thresholds[s] = _NOT_NEEDED
+        else:
+            pool = np.argpartition(self._base[s, :self._size], size - 1)[:size]
+            self._pools[s] = pool
+            self._thresholds[s] = int(self._base[s, pool].max())
+
+    def _pool_is_valid(self, s):
+        """True while slot s's pool still holds k rows no worse than any outsider."""
+        pool = self._pools[s]
+        under = np.count_nonzero(self._base[s, pool] <= self._thresholds[s])
+        return under >= min(self._k, self._size)
+
+    def _add_slot(self, slot):
+        """Start tracking a slot type that wasn't known when the session was created."""
+        self._slot_index[slot] = len(self._slot_types)
+        self._slot_types.append(slot)
+        self._base = np.vstack((self._base, np.full((1, self._base.shape[1]), _NOT_NEEDED, dtype=np.int64)))
+        self._contenders = np.append(self._contenders, 0)
+        self._pools.append(None)
+        self._thresholds.append(None)
+        for row in range(self._size):
+            if slot in self._slot_sets[row]:
+                self._contenders[-1] += 1
+                self._base[:, row] = self._row_weights(row)
+
+    def _grow(self):
+        """Double the row capacity."""
+        capacity = len(self._jobs) * 2
+        for attr in ("_jobs", "_is_main_spec", "_bosses_without_loot", "_items_needed"):
+            old = getattr(self, attr)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, attr, grown)
+        base = np.full((self._base.shape[0], capacity), _NOT_NEEDED, dtype=np.int64)
+        base[:, :self._base.shape[1]] = self._base
+        self._base = base
+
+    def _solve(self):
+        """Hungarian algorithm on the pooled rows only."""
+        if not self._items or not self._size:
+            self.assignments = []
+            return
+
+        rows = np.unique(np.concatenate([self._pools[s] for s in self._active_slots()]))
+        tables = get_tables()
+        contest = np.maximum(self._contenders - 1, 0) * tables.contest_penalty
+        slot_terms = tables.slot_weights_for(self._slot_types) + contest
+
+        item_slots = np.array([self._slot_index[item.slot_type] for item in self._items], dtype=np.intp)
+        base = self._base[:, rows][item_slots].T
+        needs = base != _NOT_NEEDED
+        weights = np.where(needs, base, 0) + slot_terms[item_slots]
+        matrix = np.where(needs, weights, _unassignable_for(weights[needs], min(len(rows), len(self._items))))
+
+        row_ind, col_ind = linear_sum_assignment(matrix)
+        real = needs[row_ind, col_ind]
+        self.assignments = [
+            (self._names[rows[r]], self._items[c].name)
+            for r, c in zip(row_ind[real], col_ind[real])
+        ]
+
+def _candidate_capacity(num_items):
+    """k for the pools: the next power of two, so adding items rarely forces a rebuild."""
+    return 1 << max(num_items - 1, 0).bit_length()
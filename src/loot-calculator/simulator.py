@@ -0,0 +1,217 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from batch import parallel_map
+from item import SLOT_TYPES
+from main import _weights_from_arrays
+from tables import get_tables
+
+# Drop table for a standard four-boss week.
+# Each boss is (number of drops, {slot_type: relative drop weight}).
+DEFAULT_DROP_TABLE = [
+    (2, {"accessory": 1}),
+    (2, {"head": 1, "hands": 1, "feet": 1}),
+    (2, {"body": 1, "legs": 1}),
+    (1, {"weapon": 1}),
+]
+
+def _compile_players(players, slot_types):
+    """Turn a list of Players into the arrays the simulation mutates."""
+    slot_index = {slot: i for i, slot in enumerate(slot_types)}
+    needs = np.zeros((len(players), len(slot_types)), dtype=bool)
+    for row, player in enumerate(players):
+        for slot in player.slot_types_needed:
+            needs[row, slot_index[slot]] = True
+
+    return {
+        "job_weights": get_tables().job_weights[[p.job.ordinal for p in players]],
+        "is_main_spec": np.array([bool(p.is_main_spec) for p in players], dtype=bool),
+        "bosses_without_loot": np.array([p.bosses_without_loot for p in players], dtype=np.int64),
+        "items_needed": np.array([p.items_needed for p in players], dtype=np.int64),
+        "needs": needs,
+    }
+
+def _compile_drop_table(drop_table, slot_types):
+    """Turn the drop table into (num_drops, slot columns, probabilities) per boss."""
+    slot_index = {slot: i for i, slot in enumerate(slot_types)}
+    bosses = []
+    for num_drops, weights in drop_table:
+        columns = np.array([slot_index[slot] for slot in weights], dtype=np.intp)
+        probs = np.array(list(weights.values()), dtype=float)
+        bosses.append((num_drops, columns, probs / probs.sum()))
+    return bosses
+
+def _simulate_chunk(args):
+    """
+    Simulate a chunk of seasons for one roster.
+
+    The roster is compiled into arrays once per chunk, and every season
+    copies the initial state into the same working buffers, so the
+    per-week loop does no Player/Item allocation at all.
+    """
+    players, weeks, drop_table, seed_seq = args
+
+    slot_types = sorted(
+        set(SLOT_TYPES)
+        | {slot for _, weights in drop_table for slot in weights}
+        | {slot for p in players for slot in p.slot_types_needed}
+    )
+    initial = _compile_players(players, slot_types)
+    bosses = _compile_drop_table(drop_table, slot_types)
+    slot_weights = get_tables().slot_weights_for(slot_types)
+
+    num_players = len(players)
+    initial_needed = initial["needs"].sum(axis=1)
+
+    # Working buffers reused for every season in this chunk
+    needs = np.empty_like(initial["needs"])
+    bosses_without_loot = np.empty_like(initial["bosses_without_loot"])
+    items_needed = np.empty_like(initial["items_needed"])
+    received = np.zeros(num_players, dtype=np.int64)
+    drought = np.zeros(num_players, dtype=np.int64)
+    longest = np.zeros(num_players, dtype=np.int64)
+    awarded = np.zeros(num_players, dtype=bool)
+
+    weeks_to_bis = []
+    items_received = []
+    longest_drought = []
+
+    for rng in (np.random.default_rng(s) for s in seed_seq):
+        np.copyto(needs, initial["needs"])
+        np.copyto(bosses_without_loot, initial["bosses_without_loot"])
+        np.copyto(items_needed, initial["items_needed"])
+        received.fill(0)
+        drought.fill(0)
+        longest.fill(0)
+        finished_week = np.where(initial_needed == 0, 0.0, np.nan)
+
+        # Roll the whole season's drops up front, one (weeks, num_drops) block per boss
+        rolls = [rng.choice(columns, size=(weeks, num_drops), p=probs) for num_drops, columns, probs in bosses]
+
+        for week in range(1, weeks + 1):
+            for boss_rolls in rolls:
+                item_slots = boss_rolls[week - 1]
+                matrix = _weights_from_arrays(
+                    job_weights=initial["job_weights"],
+                    is_main_spec=initial["is_main_spec"],
+                    bosses_without_loot=bosses_without_loot,
+                    items_needed=items_needed,
+                    needs=needs,
+                    is_final=needs.sum(axis=1) == 1,
+                    slot_weights=slot_weights,
+                    item_slots=item_slots,
+                )
+                rows, cols = linear_sum_assignment(matrix)
+
+                # Only real awards count; sentinel matches mean nobody needed it
+                real = needs[rows, item_slots[cols]]
+                rows, slots = rows[real], item_slots[cols[real]]
+
+                awarded.fill(False)
+                awarded[rows] = True
+                needs[rows, slots] = False
+                items_needed[rows] = np.maximum(items_needed[rows] - 1, 0)
+                received[rows] += 1
+
+                bosses_without_loot += 1
+                bosses_without_loot[awarded] = 0
+
+                # Droughts only count while the player still needs something
+                drought += 1
+                drought[awarded | ~needs.any(axis=1)] = 0
+                np.maximum(longest, drought, out=longest)
+
+            done = np.isnan(finished_week) & ~needs.any(axis=1)
+            finished_week[done] = week
+
+        weeks_to_bis.append(finished_week)
+        items_received.append(received.copy())
+        longest_drought.append(longest.copy())
+
+    return np.array(weeks_to_bis), np.array(items_received), np.array(longest_drought)
+
+def _jain_index(values):
+    """Jain's fairness index per row: 1.0 is perfectly even, 1/n is one player taking everything."""
+    total = values.sum(axis=1)
+    squares = (values ** 2).sum(axis=1)
+    n = values.shape[1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(squares > 0, total ** 2 / (n * squares), 1.0)
+
+def _distribution(values):
+    """Summary statistics for a distribution, ignoring NaNs."""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"mean": None, "p10": None, "p50": None, "p90": None, "max": None}
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {
+        "mean": float(values.mean()),
+        "p10": float(p10),
+        "p50": float(p50),
+        "p90": float(p90),
+        "max": float(values.max()),
+    }
+
+def simulate_seasons(players, num_seasons, weeks=8, drop_table=DEFAULT_DROP_TABLE,
+                     seed=None, max_workers=None, seasons_per_chunk=250):
+    """
+    Monte Carlo simulation of a static's loot over many seasons.
+
+    Every simulated week each boss in the drop table rolls its drops, the
+    drops are assigned with the same weights as assign_loot(), and each
+    player's bosses_without_loot, items_needed and slot_types_needed are
+    updated. Receiving an item removes its slot type from the player's needs.
+
+    Seasons are split into chunks and simulated in parallel.
+
+    Args:
+        players (list[Player]): Starting roster. The Player objects are not modified.
+        num_seasons (int): How many seasons to simulate, at least 1.
+        weeks (int): Weeks per season.
+        drop_table (list[tuple[int, dict[str, float]]]): Per boss, the number
+            of drops and the relative weight of each slot type dropping.
+        seed (int | None): Seed for reproducible results.
+        max_workers (int | None): Worker processes to use.
+        seasons_per_chunk (int): Seasons simulated per worker task.
+
+    Returns:
+        dict: Distributions across seasons:
+            - "weeks_to_bis": week each player finished their needs (all players, all seasons)
+            - "finished_rate": fraction of player-seasons that finished within the season
+            - "fairness": Jain's index of the share of needs each player received
+            - "longest_drought": most bosses in a row a player went without loot
+            - "players": per-player mean weeks_to_bis, finished_rate and items_received
+    """
+    if num_seasons < 1:
+        raise ValueError(f"num_seasons must be at least 1, got {num_seasons}")
+
+    seeds = np.random.SeedSequence(seed).spawn(num_seasons)
+    chunks = [
+        (players, weeks, drop_table, seeds[i:i + seasons_per_chunk])
+        for i in range(0, num_seasons, seasons_per_chunk)
+    ]
+    results = parallel_map(_simulate_chunk, chunks, max_workers=max_workers, chunksize=1)
+
+    weeks_to_bis = np.concatenate([r[0] for r in results]).reshape(num_seasons, len(players))
+    items_received = np.concatenate([r[1] for r in results]).reshape(num_seasons, len(players))
+    longest_drought = np.concatenate([r[2] for r in results]).reshape(num_seasons, len(players))
+
+    initial_needed = np.array([max(len(p.slot_types_needed), 1) for p in players], dtype=float)
+    finished = ~np.isnan(weeks_to_bis)
+
+    return {
+        "seasons": num_seasons,
+        "weeks": weeks,
+        "weeks_to_bis": _distribution(weeks_to_bis),
+        "finished_rate": float(finished.mean()) if finished.size else 0.0,
+        "fairness": _distribution(_jain_index(items_received / initial_needed)),
+        "longest_drought": _distribution(longest_drought.max(axis=1) if len(players) else []),
+        "players": {
+            player.name: {
+                "weeks_to_bis": _distribution(weeks_to_bis[:, i])["mean"],
+                "finished_rate": float(finished[:, i].mean()),
+                "items_received": float(items_received[:, i].mean()),
+            }
+            for i, player in enumerate(players)
+        },
+    }
@@ -0,0 +1,62 @@
+import numpy as np
+import constants
+from item import SLOT_TYPES
+from player import JOBS
+
+class WeightTables:
+    """
+    The weights from constants.py compiled into integer lookup tables.
+
+    base[job, slot, is_main_spec] holds everything that depends only on
+    those three: job priority, slot priority and the off-spec penalty.
+    Jobs are indexed by job.ordinal and slots by slot_index(); the
+    last slot column is for slot types without a weight (scored 0).
+
+    job_weights and slot_weights are the same table's per-job and per-slot
+    terms, for batched code that works on whole arrays at once. The
+    remaining weights are per-player multipliers and bonuses.
+    """
+
+    def __init__(self):
+        self.version = constants.weights_version()
+
+        self.off_spec_penalty = constants.OFF_SPEC_PENALTY
+        self.recent_loot_penalty_mult = constants.RECENT_LOOT_PENALTY_MULT
+        self.items_needed_mult = constants.ITEMS_NEEDED_MULT
+        self.final_item = constants.FINAL_ITEM
+        self.contest_penalty = constants.CONTEST_PENALTY
+
+        slot_types = list(dict.fromkeys([*SLOT_TYPES, *constants.SLOT_WEIGHTS]))
+        self.slot_indices = {slot: i for i, slot in enumerate(slot_types)}
+        self.unknown_slot = len(slot_types)
+
+        self.job_weights = np.array([constants.JOB_PRIORITY.get(job, 0) for job in JOBS], dtype=np.int64)
+        self.slot_weights = np.array(
+            [constants.SLOT_WEIGHTS.get(slot, 0) for slot in slot_types] + [0], dtype=np.int64
+        )
+        spec_weights = np.array([self.off_spec_penalty, 0], dtype=np.int64)
+        self.base = (
+            self.job_weights[:, None, None]
+            + self.slot_weights[None, :, None]
+            + spec_weights[None, None, :]
+        )
+
+        # Nested lists are faster than numpy for one lookup at a time
+        self.base_rows = self.base.tolist()
+
+    def slot_index(self, slot):
+        """Column of a slot type in base and slot_weights."""
+        return self.slot_indices.get(slot, self.unknown_slot)
+
+    def slot_weights_for(self, slot_types):
+        """Slot priority for each of the given slot type names."""
+        return self.slot_weights[[self.slot_index(slot) for slot in slot_types]]
+
+_tables = None
+
+def get_tables():
+    """The current WeightTables, recompiled first if any weight changed since the last call."""
+    global _tables
+    if _tables is None or _tables.version != constants.weights_version():
+        _tables = WeightTables()
+    return _tables
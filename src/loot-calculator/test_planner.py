@@ -0,0 +1,56 @@
+import math
+
+from item import Item
+from player import Job, Player
+from planner import plan_loot
+from simulator import simulate_seasons
+
+def test_drop_needed_in_period_0_is_awarded_in_period_0():
+    players = [Player("Alice", Job.WHM, True, 0, 1, {"head"})]
+    schedule = [[Item("Head Coffer 1", "head")], [], [Item("Head Coffer 2", "head")]]
+
+    plan = plan_loot(players, schedule)
+
+    assert plan["periods"] == [[("Alice", "Head Coffer 1")], [], []]
+
+def _replay(players, schedule, plan, bosses_per_week):
+    """What simulate_seasons() reports for a season that hands out the plan's awards."""
+    slot_of = {item.name: item.slot_type for period in schedule for item in period}
+    needs = {p.name: set(p.slot_types_needed) for p in players}
+    stats = {p.name: {"items_received": 0, "weeks_to_bis": math.nan, "drought": 0, "longest": 0} for p in players}
+    for t, awards in enumerate(plan["periods"]):
+        awarded = {name for name, _ in awards}
+        for name, item_name in awards:
+            needs[name].discard(slot_of[item_name])
+            stats[name]["items_received"] += 1
+        for name, player in stats.items():
+            player["drought"] = 0 if name in awarded or not needs[name] else player["drought"] + 1
+            player["longest"] = max(player["longest"], player["drought"])
+            if (t + 1) % bosses_per_week == 0 and not needs[name] and math.isnan(player["weeks_to_bis"]):
+                player["weeks_to_bis"] = (t + 1) // bosses_per_week
+    return stats
+
+def test_awards_and_droughts_match_simulate_seasons():
+    # Every drop has one taker, so a plan that hands each out when it drops is what the simulator does
+    players = [
+        Player("Alice", Job.WHM, True, 1, 2, {"head", "body"}),
+        Player("Bob", Job.DRG, True, 4, 2, {"hands", "feet"}),
+    ]
+    drop_table = [(1, {"head": 1}), (1, {"hands": 1}), (1, {"body": 1}), (1, {"accessory": 1}), (1, {"feet": 1})]
+    weeks = 3
+    schedule = [
+        [Item(f"{slot.title()} Coffer {week}", slot) for _, weights in [boss] for slot in weights]
+        for week in range(1, weeks + 1) for boss in drop_table
+    ]
+
+    plan = plan_loot(players, schedule)
+    replayed = _replay(players, schedule, plan, len(drop_table))
+    simulated = simulate_seasons(players, 1, weeks=weeks, drop_table=drop_table, seed=0, max_workers=1)
+
+    for player in players:
+        expected = simulated["players"][player.name]
+        assert replayed[player.name]["items_received"] == expected["items_received"]
+        assert replayed[player.name]["weeks_to_bis"] == expected["weeks_to_bis"] or (
+            math.isnan(replayed[player.name]["weeks_to_bis"]) and expected["weeks_to_bis"] is None
+        )
+    assert max(player["longest"] for player in replayed.values()) == simulated["longest_drought"]["max"]
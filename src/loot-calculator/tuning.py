@@ -0,0 +1,195 @@
+import itertools
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+import constants
+from batch import parallel_map
+from constants import SCALAR_WEIGHTS, TABLE_WEIGHTS, UNASSIGNABLE
+from main import _player_arrays, _slot_columns, _unassignable_from_range
+from player import JOBS
+from roster import Roster
+
+# Configurations per worker task
+CONFIGS_PER_CHUNK = 256
+
+def weight_grid(**axes):
+    """
+    Every combination of the given values, as a list of weight configurations.
+
+        weight_grid(FINAL_ITEM=range(-100, 0, 10), OFF_SPEC_PENALTY=[500, 1000])
+
+    gives 20 configurations. Table weights are given as a list of partial
+    dicts, e.g. JOB_PRIORITY=[{Job.WHM: -10}, {Job.WHM: -30}].
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+def compile_configs(configs, slot_types):
+    """
+    Turn weight configurations into one array per weight, with a row per configuration.
+
+    A configuration is a dict with any of SCALAR_WEIGHTS and TABLE_WEIGHTS as
+    keys. Anything it leaves out keeps its value from constants.py; table
+    overrides only replace the keys they mention.
+
+    Args:
+        configs (list[dict]): The configurations.
+        slot_types (list[str]): Slot types that get a column in slot_weights.
+
+    Returns:
+        dict[str, numpy.ndarray]: Scalars with shape (K,), job_weights with
+        shape (K, len(JOBS)) and slot_weights with shape (K, len(slot_types)).
+    """
+    known = set(SCALAR_WEIGHTS) | set(TABLE_WEIGHTS)
+    for config in configs:
+        unknown = set(config) - known
+        if unknown:
+            raise ValueError(f"Unknown weights in configuration: {sorted(unknown)}")
+
+    arrays = {
+        name.lower(): np.array([config.get(name, getattr(constants, name)) for config in configs], dtype=np.int64)
+        for name in SCALAR_WEIGHTS
+    }
+    arrays["job_weights"] = np.array(
+        [[{**constants.JOB_PRIORITY, **config.get("JOB_PRIORITY", {})}.get(job, 0) for job in JOBS]
+         for config in configs],
+        dtype=np.int64,
+    ).reshape(len(configs), len(JOBS))
+    arrays["slot_weights"] = np.array(
+        [[{**constants.SLOT_WEIGHTS, **config.get("SLOT_WEIGHTS", {})}.get(slot, 0) for slot in slot_types]
+         for config in configs],
+        dtype=np.int64,
+    ).reshape(len(configs), len(slot_types))
+    return arrays
+
+def _problem_arrays(players, items):
+    """Everything about the roster and drops that doesn't depend on the weights."""
+    slot_types, item_slots = _slot_columns(items)
+    arrays = _player_arrays(players, slot_types)
+    if isinstance(players, Roster):
+        jobs = players.jobs.astype(np.intp)
+    else:
+        jobs = np.array([player.job.ordinal for player in players], dtype=np.intp)
+    return slot_types, {
+        "jobs": jobs,
+        "is_main_spec": arrays["is_main_spec"],
+        "bosses_without_loot": arrays["bosses_without_loot"],
+        "items_needed": arrays["items_needed"],
+        "needs": arrays["needs"],
+        "is_final": arrays["is_final"],
+        "item_slots": item_slots,
+    }
+
+def _slot_tensor(problem, weights):
+    """
+    Per-slot weights for every configuration at once, shape (K, P, S).
+
+    Mirrors main._weights_from_arrays() term by term with a leading
+    configuration axis; expanding the last axis by item_slots gives each
+    configuration's players x items matrix.
+    """
+    needs = problem["needs"]
+    player_terms = (
+        np.where(problem["is_main_spec"], 0, weights["off_spec_penalty"][:, None])
+        + weights["job_weights"][:, problem["jobs"]]
+        + problem["bosses_without_loot"] * weights["recent_loot_penalty_mult"][:, None]
+        + problem["items_needed"] * weights["items_needed_mult"][:, None]
+    )
+    contest = np.maximum(needs.sum(axis=0) - 1, 0)
+    slot_terms = weights["slot_weights"] + contest * weights["contest_penalty"][:, None]
+
+    per_slot = player_terms[:, :, None] + slot_terms[:, None, :]
+    per_slot += np.where(needs & problem["is_final"][:, None], weights["final_item"][:, None, None], 0)
+
+    # Each configuration's sentinel, as main._unassignable_for() would pick it
+    real = per_slot[:, needs]
+    if not real.size:
+        return np.where(needs, per_slot, UNASSIGNABLE)
+    sentinel = _unassignable_from_range(real.max(axis=1), real.min(axis=1), min(len(needs), len(problem["item_slots"])))
+    return np.where(needs, per_slot, sentinel[:, None, None])
+
+def build_weight_tensor(players, items, configs):
+    """
+    The weight matrix for every configuration, as one (K, players, items) int64 tensor.
+
+    tensor[k] is what build_weight_matrix() would return with configs[k]
+    applied to constants.py.
+    """
+    slot_types, problem = _problem_arrays(players, items)
+    return _slot_tensor(problem, compile_configs(configs, slot_types))[:, :, problem["item_slots"]]
+
+def _solve_chunk(args):
+    """Build and solve the matrices for one chunk of configurations."""
+    problem, weights = args
+    item_slots = problem["item_slots"]
+    real_cells = problem["needs"][:, item_slots]
+
+    solutions = []
+    for matrix in _slot_tensor(problem, weights)[:, :, item_slots]:
+        row_ind, col_ind = linear_sum_assignment(matrix)
+        real = real_cells[row_ind, col_ind]
+        row_ind, col_ind = row_ind[real], col_ind[real]
+        solutions.append((row_ind, col_ind, int(matrix[row_ind, col_ind].sum())))
+    return solutions
+
+def what_if(players, items, configs, max_workers=None, chunksize=CONFIGS_PER_CHUNK):
+    """
+    Solve one roster and drop set under many weight configurations.
+
+    The current weights in constants.py are solved alongside the
+    configurations, the same way, so that tie-breaking can't make an
+    unchanged outcome look different. Configurations are compiled into
+    arrays, split into chunks and solved in parallel; each chunk builds its
+    matrices as a single batched tensor.
+
+    Args:
+        players (list[Player] | Roster): Players being considered for loot.
+        items (list[Item]): Items being distributed.
+        configs (list[dict]): Weight configurations, see compile_configs().
+        max_workers (int | None): Worker processes to use. Defaults to the CPU count.
+        chunksize (int): Configurations per worker task.
+
+    Returns:
+        dict: With keys:
+            - "baseline": the (player_name, item_name) pairs with the current weights
+            - "results": one dict per configuration, in input order, with its
+              "config", "assignments", "total_weight" and whether it "changed"
+              the assignments compared with the baseline, i.e. which slot type
+              each player gets (swapping two drops of the same slot type isn't
+              a change)
+            - "changed": indices of the configurations that changed them
+    """
+    configs = list(configs)
+    slot_types, problem = _problem_arrays(players, items)
+    weights = compile_configs(configs + [{}], slot_types)
+
+    chunks = [
+        (problem, {name: values[start:start + chunksize] for name, values in weights.items()})
+        for start in range(0, len(configs) + 1, chunksize)
+    ]
+    solutions = [s for chunk in parallel_map(_solve_chunk, chunks, max_workers=max_workers, chunksize=1)
+                 for s in chunk]
+
+    names = players.names if isinstance(players, Roster) else [player.name for player in players]
+
+    def pairs(row_ind, col_ind):
+        return [(names[r], items[c].name) for r, c in zip(row_ind, col_ind)]
+
+    *solutions, (base_rows, base_cols, _) = solutions
+    baseline = pairs(base_rows, base_cols)
+    item_slots = problem["item_slots"]
+    baseline_slots = set(zip(base_rows.tolist(), item_slots[base_cols].tolist()))
+
+    results = []
+    changed = []
+    for index, (config, (row_ind, col_ind, total)) in enumerate(zip(configs, solutions)):
+        is_changed = set(zip(row_ind.tolist(), item_slots[col_ind].tolist())) != baseline_slots
+        if is_changed:
+            changed.append(index)
+        results.append({
+            "config": config,
+            "assignments": pairs(row_ind, col_ind),
+            "total_weight": total,
+            "changed": is_changed,
+        })
+
+    return {"baseline": baseline, "results": results, "changed": changed}